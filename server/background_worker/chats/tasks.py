@@ -14,10 +14,9 @@ from celery.exceptions import SoftTimeLimitExceeded, MaxRetriesExceededError
 from utils.redis_client import sync_redis_client, RedisKeys 
 from chats.models import ChatMessage, MediaAsset
 
-from utils.media_processors.image import ImageProcessor
-from utils.media_processors.video import VideoProcessor
-from utils.media_processors.audio import AudioProcessor
-from utils.media_processors.file import FileProcessor
+# Media processors (numpy, PIL, magic, ffmpeg) are imported inside the tasks that
+# use them: the API and socket processes import this module only to build task
+# signatures and shouldn't pay ~200ms of imports on every boot for it.
 
 
 def room(user_id):
@@ -67,6 +66,19 @@ def mark_delivered_and_notify_senders(user_id):
         }
         _send_socket_update_directly(entry['sender_id'], event)
 
+def _load_asset(asset_id):
+    """
+    Asset plus the few message columns the tasks read (ids, conversation, status).
+    The message's text, render cache and reply/forward metadata stay in the DB.
+    """
+    return MediaAsset.objects.select_related("message").defer(
+        "message__content",
+        "message__render_cache",
+        "message__reply_metadata",
+        "message__forward_source_name",
+    ).get(id=asset_id)
+
+
 # ----------------------------------------------------------------------------
 # 3. OPTIMIZED FINALIZER (Shared by all media tasks)
 # ----------------------------------------------------------------------------
@@ -166,7 +178,7 @@ def process_video_task(self, asset_id):
     progress_key = f"asset_progress:{asset_id}"
     
     try:
-        asset = MediaAsset.objects.select_related("message").get(id=asset_id)
+        asset = _load_asset(asset_id)
         msg = asset.message
         
         saved_state = cache.get(checkpoint_key)
@@ -270,6 +282,7 @@ def process_video_task(self, asset_id):
             if sync_redis_client.scard(viewing_key) > 0:
                 _send_socket_update_directly(msg.receiver_id, update_payload)
 
+        from utils.media_processors.video import VideoProcessor
         processor = VideoProcessor(asset)
         master_key, thumb_key = processor.process(
             on_progress_callback=on_progress,
@@ -315,7 +328,8 @@ def process_video_task(self, asset_id):
 def process_image_task(self, asset_id):
     try:
         MediaAsset.objects.filter(id=asset_id).update(processing_status="running")
-        asset = MediaAsset.objects.select_related("message").get(id=asset_id)
+        asset = _load_asset(asset_id)
+        from utils.media_processors.image import ImageProcessor
         processor = ImageProcessor(asset)
         result_data = processor.process()
         _finalize_asset(asset, asset.message, result_data)
@@ -331,7 +345,7 @@ def process_image_task(self, asset_id):
 def process_audio_task(self, asset_id):
     try:
         MediaAsset.objects.filter(id=asset_id).update(processing_status="running")
-        asset = MediaAsset.objects.select_related("message").get(id=asset_id)
+        asset = _load_asset(asset_id)
         msg = asset.message
 
         _send_socket_update_directly(msg.sender_id, {
@@ -343,6 +357,7 @@ def process_audio_task(self, asset_id):
             }
         })
 
+        from utils.media_processors.audio import AudioProcessor
         processor = AudioProcessor(asset)
         result_data = processor.process()
         _finalize_asset(asset, msg, result_data)
@@ -356,7 +371,7 @@ def process_audio_task(self, asset_id):
 def process_file_task(self, asset_id):
     try:
         MediaAsset.objects.filter(id=asset_id).update(processing_status="running")
-        asset = MediaAsset.objects.select_related("message").get(id=asset_id)
+        asset = _load_asset(asset_id)
         msg = asset.message
         
         _send_socket_update_directly(msg.sender_id, {
@@ -368,6 +383,7 @@ def process_file_task(self, asset_id):
             }
         })
         
+        from utils.media_processors.file import FileProcessor
         processor = FileProcessor(asset)
         result_data = processor.process()
         _finalize_asset(asset, msg, result_data)
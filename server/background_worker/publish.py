@@ -0,0 +1,23 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# apply_async() is a blocking broker round trip (and keeps retrying while the broker
+# is unreachable). Request handlers hand the publish to this thread and return.
+# One worker: tasks go out in submission order over one pooled producer connection.
+_publisher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="celery-publish")
+
+
+def _log_failure(future):
+    exc = future.exception()
+    if exc is not None:
+        logger.error("Background task publish failed", exc_info=exc)
+
+
+def publish_task(signature):
+    """
+    Fire-and-forget apply_async() of a task signature or group.
+    A failed publish is logged, never raised into the caller's response.
+    """
+    _publisher.submit(signature.apply_async).add_done_callback(_log_failure)
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-10-17 03:37
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CONCURRENTLY cannot run inside a transaction; avoids locking chats_chatmessage writes
+    atomic = False
+
+    dependencies = [
+        ('chats', '0009_alter_mediaasset_object_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Build the new index first so history queries are never left without one
+        AddIndexConcurrently(
+            model_name='chatmessage',
+            index=models.Index(fields=['conversation', '-created_at', '-id'], name='chat_msg_conv_created_desc'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='chatmessage',
+            name='chats_chatm_convers_459afc_idx',
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 6.0.1 on 2026-10-17 03:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CONCURRENTLY cannot run inside a transaction; avoids locking chats_conversation writes
+    atomic = False
+
+    dependencies = [
+        ('chats', '0010_chatmessage_conv_created_id_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # State-only AlterFields: letting Django do this would drop and re-validate the FK
+        # constraints. The indexes themselves go away concurrently below.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='conversation',
+                    name='participant_1',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='conv_p1', to=settings.AUTH_USER_MODEL),
+                ),
+                migrations.AlterField(
+                    model_name='conversation',
+                    name='participant_2',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='conv_p2', to=settings.AUTH_USER_MODEL),
+                ),
+                migrations.AlterField(
+                    model_name='conversation',
+                    name='updated_at',
+                    field=models.DateTimeField(auto_now=True),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    sql='DROP INDEX CONCURRENTLY IF EXISTS "chats_conversation_participant_1_id_609f7e82";',
+                    reverse_sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "chats_conversation_participant_1_id_609f7e82" ON "chats_conversation" ("participant_1_id");',
+                ),
+                migrations.RunSQL(
+                    sql='DROP INDEX CONCURRENTLY IF EXISTS "chats_conversation_participant_2_id_61335ada";',
+                    reverse_sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "chats_conversation_participant_2_id_61335ada" ON "chats_conversation" ("participant_2_id");',
+                ),
+                migrations.RunSQL(
+                    sql='DROP INDEX CONCURRENTLY IF EXISTS "chats_conversation_updated_at_9800858d";',
+                    reverse_sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "chats_conversation_updated_at_9800858d" ON "chats_conversation" ("updated_at");',
+                ),
+            ],
+        ),
+    ]
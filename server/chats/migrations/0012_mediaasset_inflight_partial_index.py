@@ -0,0 +1,40 @@
+# Generated by Django 6.0.1 on 2026-10-17 04:02
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CONCURRENTLY cannot run inside a transaction; avoids locking chats_mediaasset writes
+    atomic = False
+
+    dependencies = [
+        ('chats', '0011_conversation_drop_redundant_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='mediaasset',
+            index=models.Index(condition=models.Q(('processing_status__in', ['queued', 'running'])), fields=['created_at'], name='media_asset_inflight_created'),
+        ),
+        # The whole-table status index is superseded by the partial index above
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='mediaasset',
+                    name='processing_status',
+                    field=models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=16),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    sql='DROP INDEX CONCURRENTLY IF EXISTS "chats_mediaasset_processing_status_1c0c8d9d_like";',
+                    reverse_sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "chats_mediaasset_processing_status_1c0c8d9d_like" ON "chats_mediaasset" ("processing_status" varchar_pattern_ops);',
+                ),
+                migrations.RunSQL(
+                    sql='DROP INDEX CONCURRENTLY IF EXISTS "chats_mediaasset_processing_status_1c0c8d9d";',
+                    reverse_sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "chats_mediaasset_processing_status_1c0c8d9d" ON "chats_mediaasset" ("processing_status");',
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-17 05:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CONCURRENTLY cannot run inside a transaction; avoids locking chats_mediaasset writes
+    atomic = False
+
+    dependencies = [
+        ('chats', '0012_mediaasset_inflight_partial_index'),
+    ]
+
+    operations = [
+        # Nothing filters on object_key (the completion claim goes by primary key);
+        # the 1024-char btree only cost every asset insert and finalize a write
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='mediaasset',
+                    name='object_key',
+                    field=models.CharField(max_length=1024),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    sql='DROP INDEX CONCURRENTLY IF EXISTS "chats_mediaasset_object_key_ae49115c_like";',
+                    reverse_sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "chats_mediaasset_object_key_ae49115c_like" ON "chats_mediaasset" ("object_key" varchar_pattern_ops);',
+                ),
+                migrations.RunSQL(
+                    sql='DROP INDEX CONCURRENTLY IF EXISTS "chats_mediaasset_object_key_ae49115c";',
+                    reverse_sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS "chats_mediaasset_object_key_ae49115c" ON "chats_mediaasset" ("object_key");',
+                ),
+            ],
+        ),
+    ]
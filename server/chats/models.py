@@ -4,11 +4,14 @@ from django.conf import settings
 
 class Conversation(models.Model):
     
-    participant_1 = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="conv_p1")
-    participant_2 = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="conv_p2")
+    # No standalone FK / updated_at indexes: the (participant_X, -updated_at) indexes below
+    # lead with the same columns, and every send rewrites updated_at, so each extra index is
+    # one more write per message (and a worse plan choice for the chat list).
+    participant_1 = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="conv_p1", db_index=False)
+    participant_2 = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="conv_p2", db_index=False)
     
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     # --- DENORMALIZED FIELDS (Updated on every Send/Read) ---
     
@@ -93,7 +96,8 @@ class ChatMessage(models.Model):
         ordering = ["-created_at"]
         indexes = [
             # The most common query: "Get messages for this conversation, newest first"
-            models.Index(fields=["conversation", "-created_at"]), 
+            # (-id breaks created_at ties so cursor pages are stable and sort-free)
+            models.Index(fields=["conversation", "-created_at", "-id"], name="chat_msg_conv_created_desc"), 
         ]
 
     def __str__(self):
@@ -112,7 +116,8 @@ class MediaAsset(models.Model):
     
     # S3 / Storage Info
     bucket = models.CharField(max_length=255)
-    object_key = models.CharField(max_length=1024, db_index=True)
+    # Not indexed: assets are always reached by id or through the message FK
+    object_key = models.CharField(max_length=1024)
     
     kind = models.CharField(max_length=10, choices=Kind.choices)
     content_type = models.CharField(max_length=255, blank=True, null=True)
@@ -131,7 +136,6 @@ class MediaAsset(models.Model):
         max_length=16,
         default="queued",
         choices=[("queued", "Queued"), ("running", "Running"), ("done", "Done"), ("failed", "Failed")],
-        db_index=True,
     )
     
     created_at = models.DateTimeField(auto_now_add=True)
@@ -139,6 +143,15 @@ class MediaAsset(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Only in-flight assets, so it stays tiny: cleanup_stuck_assets walks it by age
+            # instead of scanning the table. Per-message lookups go through the message FK.
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(processing_status__in=["queued", "running"]),
+                name="media_asset_inflight_created",
+            ),
+        ]
 
     @property
     def url(self):
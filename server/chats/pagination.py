@@ -9,6 +9,6 @@ class ChatListCursorPagination(BaseCursorPagination):
 
 class MessageCursorPagination(BaseCursorPagination):
     page_size = 30
-    ordering = '-created_at'
+    ordering = ('-created_at', '-id')
     data_key = 'messages'
     success_message = 'Messages retrieved successfully'
\ No newline at end of file
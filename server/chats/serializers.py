@@ -1,8 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.core.cache import cache  # Added for Redis API Hydration
-from .models import Conversation, ChatMessage, MediaAsset
-import math
+from .models import ChatMessage, MediaAsset
+from users.models import ChatUser
 
 User = get_user_model()
 
@@ -11,111 +11,9 @@ MAX_PART_SIZE = 512 * 1024 * 1024
 MAX_PARTS     = 10_000
 DIRECT_THRESHOLD = 5 * 1024 * 1024
 MAX_BATCH_COUNT  = 500
-
-class AttachmentItem(serializers.Serializer):
-    file_name = serializers.CharField()
-    file_size = serializers.IntegerField(min_value=1)
-    content_type = serializers.CharField()
-    kind = serializers.ChoiceField(choices=['image', 'video', 'audio', 'file']) 
-
-    client_part_size = serializers.IntegerField(required=False, min_value=MIN_PART_SIZE, max_value=MAX_PART_SIZE)
-    client_num_parts = serializers.IntegerField(required=False, min_value=1)
-    batch_count = serializers.IntegerField(required=False, min_value=1, max_value=MAX_BATCH_COUNT)
-
-    def validate(self, d):
-        file_size = d["file_size"]
-        if file_size <= DIRECT_THRESHOLD:
-            return d
-
-        for k in ("client_part_size", "client_num_parts"):
-            if k not in d:
-                raise serializers.ValidationError({k: "Required for files > 5MB"})
-
-        cps = d["client_part_size"]
-        cnp = d["client_num_parts"]
-        expected = math.ceil(file_size / cps)
-        
-        if cnp != expected:
-            raise serializers.ValidationError({"client_num_parts": f"Mismatch. Expected {expected} parts."})
-        if cnp > MAX_PARTS:
-            raise serializers.ValidationError({"client_num_parts": "Too many parts."})
-        return d
-
-class SendMessageInSerializer(serializers.Serializer):
-    receiver_id = serializers.IntegerField(min_value=1)
-    text = serializers.CharField(required=False, allow_blank=True)
-    reply_to_id = serializers.IntegerField(required=False, allow_null=True)
-    
-    attachments = serializers.ListField(
-        child=AttachmentItem(), 
-        required=False, 
-        allow_empty=True
-    )
-
-    def validate(self, attrs):
-        has_text = bool(attrs.get('text') and attrs['text'].strip())
-        has_files = bool(attrs.get('attachments') and len(attrs['attachments']) > 0)
-
-        if not has_text and not has_files:
-            raise serializers.ValidationError("Message must have either text or attachments.")
-        return attrs
-
-
-class SignBatchInSerializer(serializers.Serializer):
-    upload_id = serializers.CharField(required=True)
-    object_key = serializers.CharField(required=True)
-    start_part = serializers.IntegerField(required=False, default=1, min_value=1)
-    batch_count = serializers.IntegerField(required=False, default=100, min_value=1, max_value=MAX_BATCH_COUNT)
-    
-    
-class ForwardMessageInSerializer(serializers.Serializer):
-    message_id = serializers.IntegerField()
-    receiver_ids = serializers.ListField(
-        child=serializers.IntegerField(), 
-        min_length=1, 
-        max_length=20 
-    )
-
-    text = serializers.CharField(required=False, allow_blank=True)
-    
-
-class PrepareUploadIn(serializers.Serializer):
-    receiver_id = serializers.IntegerField(required=False, min_value=1)
-    text = serializers.CharField(required=False, allow_blank=True)
-    attachments = serializers.ListField(
-        child=AttachmentItem(), 
-        required=False, 
-        allow_empty=False
-    )
-
-    upload_id = serializers.CharField(required=False)
-    object_key = serializers.CharField(required=False)
-    start_part = serializers.IntegerField(required=False, min_value=1)
-    batch_count = serializers.IntegerField(required=False, min_value=1, max_value=MAX_BATCH_COUNT)
-
-    def validate(self, d):
-        if d.get("upload_id"):
-            if not d.get("object_key"):
-                raise serializers.ValidationError({"object_key": "Required with upload_id"})
-            return d
-
-        if not d.get("receiver_id"):
-            raise serializers.ValidationError({"receiver_id": "This field is required."})
-        
-        if not d.get("attachments"):
-            raise serializers.ValidationError({"attachments": "At least one file is required."})
-
-        return d
-
-class CompleteUploadIn(serializers.Serializer):
-    asset_id = serializers.IntegerField()
-    upload_id = serializers.CharField(required=False)
-    parts = serializers.ListField(child=serializers.DictField(), required=False)
-    
-    def validate(self, data):
-        if data.get("parts") and not data.get("upload_id"):
-            raise serializers.ValidationError("upload_id required for multipart completion")
-        return data
+SIGN_WINDOW      = 16   # default part URLs per sign-batch call
+SIGN_PREFETCH_MARGIN = 8  # parts left in a window when the client should sign the next
+INIT_SIGN_WINDOW = 8      # part URLs signed up front by the multipart init
 
 
 class UserSimpleSerializer(serializers.ModelSerializer):
@@ -123,68 +21,63 @@ class UserSimpleSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'email', 'full_name', 'avatar_url'] 
 
-class ChatListSerializer(serializers.ModelSerializer):
-    partner = serializers.SerializerMethodField()
-    is_online = serializers.SerializerMethodField()
-    last_message = serializers.SerializerMethodField()
-    unread_count = serializers.SerializerMethodField()
+# --- CHAT LIST (hot path) ---
+# Plain dict projection instead of a ModelSerializer: the shape is fixed and
+# DRF's per-field dispatch was the main CPU cost of ChatListView after I/O.
 
-    class Meta:
-        model = Conversation
-        fields = [
-            'id', 
-            'updated_at', 
-            'last_message_time', 
-            'partner', 
-            'is_online', 
-            'last_message', 
-            'unread_count'
-        ]
+LAST_MESSAGE_LABELS = {
+    'image': "📷 Photo",
+    'video': "🎥 Video",
+    'audio': "🎤 Audio",
+    'file': "📁 File",
+    'album': "🖼️ Album",
+}
 
-    def get_partner(self, obj):
-        partner_id = getattr(obj, 'partner_id', None)
-        user_map = self.context.get('user_map', {})
-        user = user_map.get(partner_id)
-        
-        if user:
-            return UserSimpleSerializer(user).data
-        return None
-
-    def get_is_online(self, obj):
-        status_map = self.context.get('online_status_map', {})
-        partner_id = getattr(obj, 'partner_id', None)
-        return status_map.get(partner_id, False)
-
-    def get_unread_count(self, obj):
-        request = self.context.get('request')
-        if not request:
-            return 0
-        
-        user_id_str = str(request.user.id)
-        counts = obj.unread_counts or {}
-        return counts.get(user_id_str, 0)
 
-    def get_last_message(self, obj):
-        msg_type = obj.last_message_type
-        content = obj.last_message_content
-        
-        if msg_type == 'text':
-            if not content:
-                return ""
-            return content[:60] + "..." if len(content) > 60 else content
-            
-        elif msg_type == 'image':
-            return "📷 Photo"
-        elif msg_type == 'video':
-            return "🎥 Video"
-        elif msg_type == 'audio':
-            return "🎤 Audio"
-        elif msg_type == 'file':
-            return "📁 File"
-        elif msg_type == 'album':
-            return "🖼️ Album"
-            
-        return ""
+def _iso(dt):
+    # Same output as DRF's DateTimeField with TIME_ZONE='UTC'
+    if dt is None:
+        return None
+    value = dt.isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+def _last_message(row):
+    if row['last_message_type'] == 'text':
+        content = row['last_message_content']
+        if not content:
+            return ""
+        return content[:60] + "..." if len(content) > 60 else content
+    return LAST_MESSAGE_LABELS.get(row['last_message_type'], "")
+
+
+# Columns ChatListView fetches with .values(); the view adds partner_* / my_unread in SQL
+CHAT_LIST_FIELDS = (
+    'id', 'updated_at', 'last_message_time', 'last_message_type', 'last_message_content',
+)
+
+
+def serialize_chat_list(rows, online_status_map):
+    """
+    rows are CHAT_LIST_FIELDS dicts plus the joined `partner_*` columns and `my_unread`.
+    """
+    return [
+        {
+            'id': row['id'],
+            'updated_at': _iso(row['updated_at']),
+            'last_message_time': _iso(row['last_message_time']),
+            'partner': {
+                'id': row['partner_id'],
+                'email': row['partner_email'],
+                'full_name': row['partner_full_name'],
+                'avatar_url': ChatUser.build_avatar_url(row['partner_avatar_bucket'], row['partner_avatar_key']),
+            },
+            'is_online': online_status_map.get(row['partner_id'], False),
+            'last_message': _last_message(row),
+            'unread_count': row['my_unread'],
+        }
+        for row in rows
+    ]
     
 
 class MediaAssetSerializer(serializers.ModelSerializer):
@@ -1,14 +1,97 @@
-from django.db import transaction
+import orjson
+import asyncio
+import logging
+
+from django.db import connection, transaction
 from django.utils import timezone
-from django.db.models import F, Q, Prefetch
+from django.db.models import Q, Prefetch
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 
 
 from .models import Conversation, ChatMessage, MediaAsset
-from .serializers import ChatMessageSerializer, ChatMessagePendingSerializer
-from utils.redis_client import RedisKeys, sync_redis_client
-from utils.s3 import s3, new_object_key, AWS_BUCKET, DEFAULT_EXPIRES_DIRECT, DEFAULT_EXPIRES_PART, MAX_BATCH_COUNT, DIRECT_THRESHOLD
+from .serializers import ChatMessageSerializer, ChatMessagePendingSerializer, SIGN_PREFETCH_MARGIN, INIT_SIGN_WINDOW
+from utils.redis_client import RedisKeys, sync_redis_client, ChatListCache
+from utils.s3 import (
+    s3, new_object_key, presign_executor, presign_put_object, presign_upload_parts, AWS_BUCKET, DIRECT_THRESHOLD
+)
+
+logger = logging.getLogger(__name__)
+
+# Enum members bound once at import: these run on every send
+_MSG_TEXT = ChatMessage.MsgType.TEXT
+_MSG_ALBUM = ChatMessage.MsgType.ALBUM
+_MSG_FILE = ChatMessage.MsgType.FILE
+
+KIND_TO_MSG_TYPE = {
+    'image': ChatMessage.MsgType.IMAGE,
+    'video': ChatMessage.MsgType.VIDEO,
+    'audio': ChatMessage.MsgType.AUDIO,
+    'file': ChatMessage.MsgType.FILE,
+}
+
+PREVIEW_PREFIXES = {
+    ChatMessage.MsgType.IMAGE: "📷 ",
+    ChatMessage.MsgType.VIDEO: "🎥 ",
+    ChatMessage.MsgType.AUDIO: "🎤 ",
+    ChatMessage.MsgType.FILE: "📁 ",
+    ChatMessage.MsgType.ALBUM: "🖼️ ",
+}
+
+
+# Conversation upsert shared by the send CTEs: denormalized preview + unread badge.
+# The row lock taken by ON CONFLICT DO UPDATE serializes concurrent senders.
+_CONV_UPSERT_CTE = """
+conv AS (
+    INSERT INTO chats_conversation
+        (participant_1_id, participant_2_id, created_at, updated_at,
+         last_message_content, last_message_type, last_message_time, unread_counts)
+    VALUES (%(p1)s, %(p2)s, %(now)s, %(now)s, %(preview)s, %(msg_type)s, %(now)s, %(new_counts)s::jsonb)
+    ON CONFLICT (participant_1_id, participant_2_id) DO UPDATE SET
+        last_message_content = EXCLUDED.last_message_content,
+        last_message_type = EXCLUDED.last_message_type,
+        last_message_time = EXCLUDED.last_message_time,
+        updated_at = EXCLUDED.updated_at,
+        unread_counts = CASE WHEN %(bump)s THEN jsonb_set(
+            COALESCE(chats_conversation.unread_counts, '{}'::jsonb),
+            ARRAY[%(receiver_key)s],
+            to_jsonb(COALESCE((chats_conversation.unread_counts ->> %(receiver_key)s)::int, 0) + 1)
+        ) ELSE chats_conversation.unread_counts END
+    RETURNING id
+)"""
+
+_MESSAGE_INSERT = """
+INSERT INTO chats_chatmessage
+    (conversation_id, sender_id, receiver_id, message_type, content, asset_count, render_cache,
+     reply_to_id, reply_metadata, is_forwarded, forward_source_name, is_edited, edited_at,
+     status, is_deleted, created_at, updated_at)
+SELECT conv.id, %(sender_id)s, %(receiver_id)s, %(msg_type)s, %(content)s, %(asset_count)s, '{}'::jsonb,
+       %(reply_to_id)s, %(reply_metadata)s::jsonb, false, NULL, false, NULL,
+       %(status)s, false, %(now)s, %(now)s
+FROM conv
+RETURNING id, conversation_id"""
+
+# Text send = conversation upsert + message insert as a single CTE (see send_text_message)
+SEND_TEXT_SQL = "WITH" + _CONV_UPSERT_CTE + _MESSAGE_INSERT
+
+# Media send = the same, plus the album's assets from parallel arrays (see _create_media_message)
+SEND_MEDIA_SQL = "WITH" + _CONV_UPSERT_CTE + """,
+msg AS (""" + _MESSAGE_INSERT + """
+),
+assets AS (
+    INSERT INTO chats_mediaasset
+        (message_id, bucket, object_key, kind, content_type, file_name, file_size,
+         variants, processing_status, created_at, updated_at)
+    SELECT msg.id, %(bucket)s, a.object_key, a.kind, a.content_type, a.file_name, a.file_size,
+           '{}'::jsonb, 'queued', %(now)s, %(now)s
+    FROM msg, unnest(%(object_keys)s::text[], %(kinds)s::text[], %(content_types)s::text[],
+                     %(file_names)s::text[], %(file_sizes)s::bigint[])
+              AS a(object_key, kind, content_type, file_name, file_size)
+    RETURNING id, object_key
+)
+SELECT msg.id, msg.conversation_id, assets.id, assets.object_key FROM msg, assets
+"""
+
 
 class ChatService:
     @staticmethod
@@ -18,45 +101,49 @@ class ChatService:
     @staticmethod
     def _determine_initial_status(sender_id, receiver_id):
         """
-        Helper: Checks Redis to see if the user is Viewing or Online.
-        Uses SYNCHRONOUS Redis client for performance in Views.
+        Helper: Checks Redis to see if the user is Viewing (Blue Ticks) or Online (Double Ticks).
+        Uses SYNCHRONOUS Redis client for performance in Views; both checks share one round trip.
         """
-        # 1. Check Viewing (Blue Ticks)
-        viewing_key = RedisKeys.viewing(receiver_id, sender_id)
-        # Direct call - No async_to_sync needed
-        is_viewing = sync_redis_client.scard(viewing_key) > 0
-
-        if is_viewing:
-            return ChatMessage.Status.SEEN, True
-
-        # 2. Check Online (Double Ticks)
-        is_online = sync_redis_client.sismember(RedisKeys.ONLINE_USERS, receiver_id)
-        
-        if is_online:
-            return ChatMessage.Status.DELIVERED, False
-        
-        # 3. Default (Single Tick)
-        return ChatMessage.Status.SENT, False
+        return ChatService._determine_initial_statuses(sender_id, [receiver_id])[receiver_id]
     
     
+    @staticmethod
+    def _determine_initial_statuses(sender_id, receiver_ids):
+        """
+        Batched _determine_initial_status: one pipelined round trip for all receivers.
+        Returns { receiver_id: (status, is_viewing) }.
+        """
+        pipe = sync_redis_client.pipeline(transaction=False)
+        for rid in receiver_ids:
+            pipe.scard(RedisKeys.viewing(rid, sender_id))
+            pipe.sismember(RedisKeys.ONLINE_USERS, rid)
+        replies = pipe.execute()
+
+        result = {}
+        for i, rid in enumerate(receiver_ids):
+            viewing_count, is_online = replies[2 * i], replies[2 * i + 1]
+            if viewing_count > 0:
+                result[rid] = (ChatMessage.Status.SEEN, True)
+            elif is_online:
+                result[rid] = (ChatMessage.Status.DELIVERED, False)
+            else:
+                result[rid] = (ChatMessage.Status.SENT, False)
+        return result
+
+
     @staticmethod
     def _generate_preview_text(content, msg_type):
         """
         Helper: Generates the short preview string for the Conversation list.
         """
         preview = content
-        if msg_type != ChatMessage.MsgType.TEXT:
+        if msg_type != _MSG_TEXT:
             # Emoji Prefix Logic
-            prefix = ""
-            if msg_type == ChatMessage.MsgType.IMAGE: prefix = "📷 "
-            elif msg_type == ChatMessage.MsgType.VIDEO: prefix = "🎥 "
-            elif msg_type == ChatMessage.MsgType.AUDIO: prefix = "🎤 "
-            elif msg_type == ChatMessage.MsgType.FILE: prefix = "📁 "
-            elif msg_type == ChatMessage.MsgType.ALBUM: prefix = "🖼️ "
+            prefix = PREVIEW_PREFIXES.get(msg_type, "")
 
             if not content:
                 # No Caption -> "📷 Image"
-                label = msg_type.capitalize() if msg_type != ChatMessage.MsgType.ALBUM else "Album"
+                label = msg_type.capitalize()
                 preview = f"{prefix}{label}"
             else:
                 # Caption exists -> "📷 Check this out"
@@ -65,26 +152,12 @@ class ChatService:
         return preview
 
     @staticmethod
-    def _update_conversation(conversation, receiver_id, content, msg_type, msg_time, is_viewing):
+    def _invalidate_chat_lists(*user_ids):
         """
-        Helper: Updates the denormalized fields on the Conversation model.
+        Helper: Conversation rows of these users changed; expire their cached chat list.
+        After COMMIT, and robust: Redis being down must not fail a write that already landed.
         """
-        current_counts = conversation.unread_counts or {}
-        receiver_str = str(receiver_id)
-
-        # Increment Unread Count (Only if NOT viewing)
-        if not is_viewing:
-            current_counts[receiver_str] = current_counts.get(receiver_str, 0) + 1
-        
-        # Generate Preview
-        preview_text = ChatService._generate_preview_text(content, msg_type)
-
-        conversation.last_message_content = preview_text
-        conversation.last_message_type = msg_type
-        conversation.last_message_time = msg_time
-        conversation.unread_counts = current_counts
-        
-        conversation.save(update_fields=['last_message_content', 'last_message_type', 'last_message_time', 'unread_counts', 'updated_at'])
+        transaction.on_commit(lambda: ChatListCache.invalidate(user_ids), robust=True)
 
     @staticmethod
     def _broadcast_message(sender_id, receiver_id, message_instance, serializer_class=None):
@@ -103,23 +176,47 @@ class ChatService:
             }
         }
         
-        # 1. Notify Receiver (So they see the new message)
-        async_to_sync(channel_layer.group_send)(
-            ChatService._get_channel_group(receiver_id), 
-            event
-        )
+        async def _send_both():
+            await asyncio.gather(
+                # 1. Notify Receiver (So they see the new message)
+                channel_layer.group_send(ChatService._get_channel_group(receiver_id), event),
+                # 2. Notify Sender (So their OTHER devices update instantly)
+                channel_layer.group_send(ChatService._get_channel_group(sender_id), event),
+            )
 
-        # 2. Notify Sender (So their OTHER devices update instantly)
-        async_to_sync(channel_layer.group_send)(
-            ChatService._get_channel_group(sender_id), 
-            event
-        )
+        # One event-loop hop for both sends
+        async_to_sync(_send_both)()
+
+    @staticmethod
+    def _broadcast_messages(sender_id, messages, serializer_class=None):
+        """
+        Fan-out version of _broadcast_message: serializes the batch once and
+        dispatches every group_send from a single event-loop hop.
+        """
+        channel_layer = get_channel_layer()
+        Serializer = serializer_class or ChatMessageSerializer
+        serialized = Serializer(messages, many=True).data
+
+        async def _send_all():
+            sends = []
+            for msg, data in zip(messages, serialized):
+                event = {
+                    "type": "forward_event",
+                    "payload": {"type": "chat_message_new", "data": data}
+                }
+                sends.append(channel_layer.group_send(ChatService._get_channel_group(msg.receiver_id), event))
+                sends.append(channel_layer.group_send(ChatService._get_channel_group(sender_id), event))
+            await asyncio.gather(*sends)
+
+        async_to_sync(_send_all)()
 
     @staticmethod
     def _get_reply_data(reply_to_id):
         if not reply_to_id: return None, None
         try:
-            parent = ChatMessage.objects.get(id=reply_to_id)
+            parent = ChatMessage.objects.select_related('sender').only(
+                'id', 'content', 'message_type', 'sender__full_name'
+            ).get(id=reply_to_id)
             meta = {
                 "id": parent.id,
                 "sender_name": parent.sender.full_name,
@@ -132,41 +229,85 @@ class ChatService:
 
     @staticmethod
     def _determine_msg_type(attachments):
-        if len(attachments) > 1: return ChatMessage.MsgType.ALBUM
-        if len(attachments) == 0: return ChatMessage.MsgType.TEXT
-        kind = attachments[0]['kind']
-        if kind == 'image': return ChatMessage.MsgType.IMAGE
-        if kind == 'video': return ChatMessage.MsgType.VIDEO
-        if kind == 'audio': return ChatMessage.MsgType.AUDIO
-        return ChatMessage.MsgType.FILE
+        # Single attachment is the common case: one length check, one dict lookup
+        count = len(attachments)
+        if count == 1:
+            return KIND_TO_MSG_TYPE.get(attachments[0]['kind'], _MSG_FILE)
+        return _MSG_ALBUM if count else _MSG_TEXT
 
 
     @staticmethod
-    @transaction.atomic
-    def send_text_message(sender, receiver_id, content, reply_to_id=None):
+    def _send_params(sender, receiver_id, content, msg_type, asset_count, reply_to_id):
+        """
+        Helper: parameters shared by SEND_TEXT_SQL and SEND_MEDIA_SQL.
+        Returns (params, reply_to, reply_metadata).
+        """
         p1, p2 = sorted([sender.id, receiver_id])
-        conversation, _ = Conversation.objects.select_for_update().get_or_create(
-            participant_1_id=p1, participant_2_id=p2,
-            defaults={'unread_counts': {str(p1): 0, str(p2): 0}}
-        )
-
         status, is_viewing = ChatService._determine_initial_status(sender.id, receiver_id)
-
         reply_to, reply_metadata = ChatService._get_reply_data(reply_to_id)
 
-        msg = ChatMessage.objects.create(
-            conversation=conversation,
+        receiver_key = str(receiver_id)
+        new_counts = {str(p1): 0, str(p2): 0}
+        if not is_viewing:
+            new_counts[receiver_key] = 1
+
+        params = {
+            "p1": p1,
+            "p2": p2,
+            "now": timezone.now(),
+            "preview": ChatService._generate_preview_text(content, msg_type),
+            "new_counts": orjson.dumps(new_counts).decode(),
+            "bump": not is_viewing,
+            "receiver_key": receiver_key,
+            "msg_type": msg_type,
+            "sender_id": sender.id,
+            "receiver_id": receiver_id,
+            "content": content,
+            "asset_count": asset_count,
+            "reply_to_id": reply_to.id if reply_to else None,
+            "reply_metadata": orjson.dumps(reply_metadata).decode() if reply_metadata else None,
+            "status": status,
+        }
+        return params, reply_to, reply_metadata
+
+    @staticmethod
+    def send_text_message(sender, receiver_id, content, reply_to_id=None):
+        """
+        Upserts the Conversation (denormalized preview + unread badge) and inserts the
+        Message in ONE statement: one round trip, one plan, one WAL flush.
+        The row lock taken by ON CONFLICT DO UPDATE serializes concurrent senders,
+        so the badge increment can't be lost.
+        """
+        params, reply_to, reply_metadata = ChatService._send_params(
+            sender, receiver_id, content, _MSG_TEXT, 0, reply_to_id
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(SEND_TEXT_SQL, params)
+            msg_id, conversation_id = cursor.fetchone()
+
+        # Rebuild the instance from what we just wrote (no re-fetch)
+        msg = ChatMessage(
+            id=msg_id,
+            conversation_id=conversation_id,
             sender=sender,
             receiver_id=receiver_id,
             content=content,
-            message_type=ChatMessage.MsgType.TEXT,
+            message_type=_MSG_TEXT,
             reply_to=reply_to,
             reply_metadata=reply_metadata,
-            status=status
+            status=params["status"],
+            created_at=params["now"],
+            updated_at=params["now"],
         )
+        msg._state.adding = False
+        msg._state.db = connection.alias
+        # Text messages have no assets: spare the serializer the lookup
+        msg._prefetched_objects_cache = {'media_assets': MediaAsset.objects.none()}
+
+        ChatService._invalidate_chat_lists(sender.id, receiver_id)
 
-        ChatService._update_conversation(conversation, receiver_id, content, 'text', msg.created_at, is_viewing)
-        ChatService._broadcast_message(sender.id, receiver_id, msg)
+        # Broadcast after COMMIT: no event for a row that might still roll back.
+        transaction.on_commit(lambda: ChatService._broadcast_message(sender.id, receiver_id, msg))
         
         return msg
 
@@ -174,124 +315,193 @@ class ChatService:
     # 2. INITIALIZE MEDIA MESSAGE (S3 Prep)
     # =========================================================================
     @staticmethod
-    @transaction.atomic
     def initialize_media_message(sender, receiver_id, text_caption, attachments, reply_to_id=None):
         """
         Creates the Message (Status based on Redis) and MediaAssets.
         Returns: The Message Object AND the S3 Upload Instructions.
         """
-        # A. Setup Conversation
-        p1, p2 = sorted([sender.id, receiver_id])
-        conversation, _ = Conversation.objects.select_for_update().get_or_create(
-            participant_1_id=p1, participant_2_id=p2,
-            defaults={'unread_counts': {str(p1): 0, str(p2): 0}}
-        )
+        # S3 first, outside the transaction: create_multipart_upload is a network round
+        # trip per file and must not run under the row lock below. Those fan out on the
+        # pool; direct-upload URLs are pure CPU signing, so they are built here meanwhile
+        # and the album costs max(per-file) rather than the sum.
+        object_keys = [new_object_key(sender.id, item["file_name"]) for item in attachments]
+        pending = {
+            i: presign_executor.submit(ChatService._generate_s3_params, item, object_key)
+            for i, (item, object_key) in enumerate(zip(attachments, object_keys))
+            if item["file_size"] > DIRECT_THRESHOLD
+        }
+        s3_params = [None] * len(attachments)
+        try:
+            for i, (item, object_key) in enumerate(zip(attachments, object_keys)):
+                if i not in pending:
+                    s3_params[i] = ChatService._generate_s3_params(item, object_key)
+            for i, future in pending.items():
+                s3_params[i] = future.result()
+
+            return ChatService._create_media_message(
+                sender, receiver_id, text_caption, attachments, object_keys, s3_params, reply_to_id
+            )
+        except Exception:
+            # No message row points at these uploads, so nothing would ever complete or
+            # abort them. Let every in-flight create settle first: an upload opened after
+            # the failure would otherwise leak the same way.
+            for i, future in pending.items():
+                if s3_params[i] is None and future.exception() is None:
+                    s3_params[i] = future.result()
+            ChatService._abort_multipart_uploads(s3_params)
+            raise
 
-        # B. Determine Status
-        status, is_viewing = ChatService._determine_initial_status(sender.id, receiver_id)
+    @staticmethod
+    def _abort_multipart_uploads(s3_params):
+        """
+        Best-effort abort of the multipart uploads opened for a send that failed.
+        Errors are logged, never raised: the caller is re-raising the original one.
+        """
+        aborts = [
+            presign_executor.submit(
+                s3.abort_multipart_upload,
+                Bucket=params["bucket"], Key=params["object_key"], UploadId=params["upload_id"],
+            )
+            for params in s3_params
+            if params and params["mode"] == "multipart"
+        ]
+        for future in aborts:
+            try:
+                future.result()
+            except Exception:
+                logger.warning("Failed to abort orphaned multipart upload", exc_info=True)
 
-        # C. Determine Msg Type
+    @staticmethod
+    def _create_media_message(sender, receiver_id, text_caption, attachments, object_keys, s3_params, reply_to_id):
+        """
+        Conversation upsert, Message and the album's MediaAssets in ONE statement
+        (SEND_MEDIA_SQL): one round trip and no explicit BEGIN/COMMIT around it.
+        """
         msg_type = ChatService._determine_msg_type(attachments)
-
-        # D. Create Message
-        reply_to, reply_metadata = ChatService._get_reply_data(reply_to_id)
-        
-        msg = ChatMessage.objects.create(
-            conversation=conversation,
+        params, reply_to, reply_metadata = ChatService._send_params(
+            sender, receiver_id, text_caption, msg_type, len(attachments), reply_to_id
+        )
+        params.update(
+            bucket=AWS_BUCKET,
+            object_keys=object_keys,
+            kinds=[item["kind"] for item in attachments],
+            content_types=[item["content_type"] for item in attachments],
+            file_names=[item["file_name"] for item in attachments],
+            file_sizes=[item["file_size"] for item in attachments],
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(SEND_MEDIA_SQL, params)
+            rows = cursor.fetchall()
+
+        # Rebuild the instances from what we just wrote (no re-fetch)
+        now = params["now"]
+        msg_id, conversation_id = rows[0][0], rows[0][1]
+        msg = ChatMessage(
+            id=msg_id,
+            conversation_id=conversation_id,
             sender=sender,
             receiver_id=receiver_id,
-            content=text_caption, 
+            content=text_caption,
             message_type=msg_type,
             reply_to=reply_to,
             reply_metadata=reply_metadata,
-            status=status, 
-            asset_count=len(attachments)
+            status=params["status"],
+            asset_count=len(attachments),
+            created_at=now,
+            updated_at=now,
         )
-
-        # E. Process Attachments (Create Assets & Generate URLs)
-        upload_instructions = []
-        
-        for item in attachments:
-            file_name = item["file_name"]
-            kind = item["kind"]
-            object_key = new_object_key(sender.id, file_name)
-
-            # Create Asset Row
-            asset = MediaAsset.objects.create(
+        msg._state.adding = False
+        msg._state.db = connection.alias
+
+        # RETURNING order is not guaranteed: match ids back by (unique) object key
+        asset_ids = {object_key: asset_id for _, _, asset_id, object_key in rows}
+        assets = []
+        for item, object_key, instructions in zip(attachments, object_keys, s3_params):
+            asset = MediaAsset(
+                id=asset_ids[object_key],
                 message=msg,
                 bucket=AWS_BUCKET,
                 object_key=object_key,
-                kind=kind,
+                kind=item["kind"],
                 content_type=item["content_type"],
-                file_name=file_name,
+                file_name=item["file_name"],
                 file_size=item["file_size"],
-                processing_status="queued"
+                processing_status="queued",
+                created_at=now,
+                updated_at=now,
             )
+            asset._state.adding = False
+            asset._state.db = connection.alias
+            assets.append(asset)
+            # The S3 params already are the per-file upload instructions
+            instructions["asset_id"] = asset.id
 
-            # Generate S3 Params (Reuse your S3 logic here)
-            params = ChatService._generate_s3_params(asset, item, object_key)
-            params["asset_id"] = asset.id
-            params["object_key"] = object_key
-            upload_instructions.append(params)
+        # The pending broadcast serializes media_assets: hand it the rows we just wrote
+        prefetched = MediaAsset.objects.all()
+        prefetched._result_cache = assets
+        prefetched._prefetch_done = True
+        msg._prefetched_objects_cache = {'media_assets': prefetched}
+
+        ChatService._invalidate_chat_lists(sender.id, receiver_id)
 
-        # F. Update Conv & Broadcast
         # Note: We notify immediately so receiver sees "Sending photo..." (or the gray grid)
-        ChatService._update_conversation(conversation, receiver_id, text_caption, msg_type, msg.created_at, is_viewing)
-        ChatService._broadcast_message(sender.id, receiver_id, msg, serializer_class=ChatMessagePendingSerializer)
+        transaction.on_commit(
+            lambda: ChatService._broadcast_message(sender.id, receiver_id, msg, serializer_class=ChatMessagePendingSerializer)
+        )
+
+        return msg, s3_params
 
-        return msg, upload_instructions
+    @staticmethod
+    def sign_part_window(object_key, upload_id, start, count):
+        """
+        Presigns parts [start, start + count) of a multipart upload.
+        Returns the `batch` shape shared by the init response and SignBatchView.
+        """
+        return {
+            "items": presign_upload_parts(object_key, upload_id, range(start, start + count)),
+            # Pipelining hints: once part `prefetch_at_part` is uploading, sign the
+            # window starting at `next_start_hint` so URLs are ready before they run out
+            "next_start_hint": start + count,
+            "prefetch_at_part": max(start, start + count - SIGN_PREFETCH_MARGIN),
+        }
 
     @staticmethod
-    def _generate_s3_params(asset, item_data, object_key):
-        """Helper to generate S3 params for a single file"""
-        file_size = asset.file_size
-        content_type = asset.content_type
+    def _generate_s3_params(item_data, object_key):
+        """
+        Helper to generate S3 params for a single file.
+        Multipart uploads come with only the first INIT_SIGN_WINDOW part URLs, so the
+        client can start at once; SignBatchView signs the rest as it progresses.
+        """
+        file_size = item_data["file_size"]
+        content_type = item_data["content_type"]
         
         # Direct Upload
         if file_size <= DIRECT_THRESHOLD:
-            put_url = s3.generate_presigned_url(
-                ClientMethod="put_object",
-                Params={"Bucket": AWS_BUCKET, "Key": object_key, "ContentType": content_type},
-                ExpiresIn=DEFAULT_EXPIRES_DIRECT,
-            )
             return {
                 "mode": "direct",
-                "put_url": put_url,
+                "bucket": AWS_BUCKET,
+                "object_key": object_key,
+                "put_url": presign_put_object(object_key, content_type),
             }
-        # Multipart Upload
+        # Multipart Upload (first window signed; client calls sign-batch for the rest)
         else:
-            cps = int(item_data["client_part_size"])
-            cnp = int(item_data["client_num_parts"])
-            
             create = s3.create_multipart_upload(
                 Bucket=AWS_BUCKET,
                 Key=object_key,
                 ContentType=content_type,
                 ServerSideEncryption="AES256",
             )
-            upload_id = create["UploadId"]
-            
-            # Initial batch of URLs
-            batch_count = min(item_data.get("batch_count") or 100, MAX_BATCH_COUNT)
-            items = []
-            max_pn = min(cnp, batch_count)
-            
-            for pn in range(1, max_pn + 1):
-                url = s3.generate_presigned_url(
-                    ClientMethod="upload_part",
-                    Params={"Bucket": AWS_BUCKET, "Key": object_key, "UploadId": upload_id, "PartNumber": pn},
-                    ExpiresIn=DEFAULT_EXPIRES_PART,
-                )
-                items.append({"part_number": pn, "url": url})
 
+            upload_id = create["UploadId"]
+            num_parts = int(item_data["client_num_parts"])
             return {
                 "mode": "multipart",
+                "bucket": AWS_BUCKET,
+                "object_key": object_key,
                 "upload_id": upload_id,
-                "part_size": cps,
-                "num_parts": cnp,
-                "batch": {
-                    "items": items,
-                }
+                "part_size": int(item_data["client_part_size"]),
+                "num_parts": num_parts,
+                "batch": ChatService.sign_part_window(object_key, upload_id, 1, min(num_parts, INIT_SIGN_WINDOW)),
             }
     
     
@@ -360,8 +570,10 @@ class ChatService:
         messages_to_create = []
         receiver_metadata = {} 
 
+        initial_statuses = ChatService._determine_initial_statuses(sender.id, receiver_ids)
+
         for rid in receiver_ids:
-            status, is_viewing = ChatService._determine_initial_status(sender.id, rid)
+            status, is_viewing = initial_statuses[rid]
             receiver_metadata[rid] = {'status': status, 'is_viewing': is_viewing}
             
             messages_to_create.append(ChatMessage(
@@ -454,9 +666,10 @@ class ChatService:
                 ]
             )
 
-        # --- STEP 8: NOTIFICATIONS ---
-        for msg in created_msgs:
-            ChatService._broadcast_message(sender.id, msg.receiver_id, msg)
+            ChatService._invalidate_chat_lists(sender.id, *(msg.receiver_id for msg in created_msgs))
+
+        # --- STEP 8: NOTIFICATIONS (Once committed, so receivers can fetch them) ---
+        transaction.on_commit(lambda: ChatService._broadcast_messages(sender.id, created_msgs))
 
         return len(created_msgs)
     
@@ -480,6 +693,8 @@ class ChatService:
         counts[reader_str] = 0
         conversation.unread_counts = counts
         conversation.save(update_fields=['unread_counts'])
+        # Only the reader's own badge changed
+        ChatService._invalidate_chat_lists(reader.id)
 
         # 3. Determine the 'Cursor' (Last Read ID)
         cursor_id = latest_message_id
@@ -1,46 +1,74 @@
+from urllib.parse import parse_qs, urlsplit
+
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q, Case, When, F
-from django.contrib.auth import get_user_model
+from rest_framework.utils.urls import replace_query_param
+from django.db import connection
+from django.db.models import Prefetch, F, Func, Value, IntegerField, TextField
+from django.db.models.functions import Cast, Coalesce
 
-from asgiref.sync import async_to_sync
 from botocore.exceptions import ClientError
+from celery import group
 
 from utils.response import success_response, error_response
-from utils.aws import s3, AWS_BUCKET, new_object_key
-from utils.redis_client import ChatRedisService
-from utils.s3 import DEFAULT_EXPIRES_PART
+from utils.redis_client import ChatRedisService, ChatListCache
+from utils.s3 import s3, presign_executor
+from utils.pagination import UnionAllQuerySet
 
 from .models import Conversation, ChatMessage, MediaAsset
-from .serializers import (
-    CompleteUploadIn,
-    ChatListSerializer,
-    SendMessageInSerializer,
-    SignBatchInSerializer,
-    ForwardMessageInSerializer,
-    ChatMessageListSerializer
-)
+from .serializers import serialize_chat_list, CHAT_LIST_FIELDS, ChatMessageListSerializer
+from .schemas import parse, SendMessageIn, CompleteUploadIn, CompleteUploadBatchIn, SignBatchIn, ForwardMessageIn
 from background_worker.chats.tasks import (
     process_video_task,
     process_image_task,
     process_audio_task,
     process_file_task
 )
+from background_worker.publish import publish_task
 from .pagination import ChatListCursorPagination, MessageCursorPagination
+from users.services import UserProfileService
 from .services import ChatService
 
-User = get_user_model()
+
+# CompleteUpload's claim: queued -> running for the caller's own assets, all or none,
+# as one autocommit statement (no BEGIN/COMMIT round trips). FOR UPDATE makes a
+# concurrent retry wait on the rows and re-check 'queued', so it claims nothing and
+# an asset can never be processed twice; the count guard drops partial album claims.
+CLAIM_ASSETS_SQL = """
+WITH target AS (
+    SELECT a.id
+    FROM chats_mediaasset AS a
+    JOIN chats_chatmessage AS m ON m.id = a.message_id
+    WHERE a.id = ANY(%(ids)s)
+      AND a.processing_status = 'queued'
+      AND m.sender_id = %(user_id)s
+    FOR UPDATE OF a
+)
+UPDATE chats_mediaasset AS a
+SET processing_status = 'running'
+FROM target
+WHERE a.id = target.id
+  AND (SELECT count(*) FROM target) = %(expected)s
+RETURNING a.id, a.bucket, a.object_key, a.kind
+"""
+
+KIND_TO_TASK = {
+    MediaAsset.Kind.VIDEO: process_video_task,
+    MediaAsset.Kind.IMAGE: process_image_task,
+    MediaAsset.Kind.AUDIO: process_audio_task,
+    MediaAsset.Kind.FILE: process_file_task,
+}
+
     
 
 class SendMessageView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        ser = SendMessageInSerializer(data=request.data)
-        if not ser.is_valid():
-            return error_response(message="Invalid data", errors=ser.errors, status=400)
+        data, errors = parse(SendMessageIn, request.data)
+        if errors:
+            return error_response(message="Invalid data", errors=errors, status=400)
         
-        data = ser.validated_data
         user = request.user
         receiver_id = data['receiver_id']
         text = data.get('text', '') 
@@ -94,94 +122,95 @@ class CompleteUpload(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        ser = CompleteUploadIn(data=request.data)
-        if not ser.is_valid():
-            return error_response(ser.errors, status=400)
-            
-        d = ser.validated_data
-        
-        # 1. Fetch Asset + Message efficiently
-        try:
-            asset = MediaAsset.objects.select_related('message').get(
-                id=d['asset_id'], 
-                processing_status="queued"
-            )
-        except MediaAsset.DoesNotExist:
-            return error_response("Asset not found or already processed", status=404)
-
-        # 2. SECURITY: Verify Ownership
-        if asset.message.sender_id != request.user.id:
-            return error_response("You do not have permission to process this asset.", status=403)
-
-        # 3. S3 Safeguard: Catch AWS Errors gracefully
-        if d.get("parts") and d.get("upload_id"):
-            try:
-                 s3.complete_multipart_upload(
-                     Bucket=asset.bucket, 
-                     Key=asset.object_key, 
-                     UploadId=d["upload_id"], 
-                     MultipartUpload={"Parts": d["parts"]}
-                 )
-            except ClientError as e:
-                 error_msg = e.response['Error']['Message'] if 'Error' in e.response else str(e)
-                 return error_response(f"AWS S3 Error: {error_msg}", status=400)
-
-        # 4. PREVENT RACE CONDITIONS (Double Clicks)
-        asset.processing_status = "running"
-        asset.save(update_fields=['processing_status'])
-
-
-        if asset.kind == MediaAsset.Kind.VIDEO:
-            process_video_task.delay(asset.id)
-        elif asset.kind == MediaAsset.Kind.IMAGE:
-            process_image_task.delay(asset.id)
-        elif asset.kind == MediaAsset.Kind.AUDIO:
-            process_audio_task.delay(asset.id)
+        # Single asset, or {"items": [...]} when several album files finish together
+        if "items" in request.data:
+            d, errors = parse(CompleteUploadBatchIn, request.data)
+            items = d["items"] if d else None
         else:
-            process_file_task.delay(asset.id)
+            d, errors = parse(CompleteUploadIn, request.data)
+            items = [d] if d else None
+        if errors:
+            return error_response(message="Invalid data", errors=errors, status=400)
+
+        asset_ids = [item["asset_id"] for item in items]
+        unique_ids = set(asset_ids)
+
+        # 1. Claim (see CLAIM_ASSETS_SQL): every asset or none, in one round trip
+        with connection.cursor() as cursor:
+            cursor.execute(CLAIM_ASSETS_SQL, {
+                "ids": list(unique_ids), "user_id": request.user.id, "expected": len(unique_ids),
+            })
+            assets = {row[0]: MediaAsset(id=row[0], bucket=row[1], object_key=row[2], kind=row[3])
+                      for row in cursor.fetchall()}
+
+        if len(assets) != len(unique_ids):
+            # Only this error path pays for telling 404 from 403
+            queued = MediaAsset.objects.filter(id__in=unique_ids, processing_status="queued")
+            if queued.count() != len(unique_ids):
+                return error_response("Asset not found or already processed", status=404)
+            # 2. SECURITY: Verify Ownership
+            return error_response("You do not have permission to process this asset.", status=403)
 
+        # 3. S3 Safeguard: multipart completions run concurrently, with no row locks held
+        s3_errors = presign_executor.map(_complete_multipart, [assets[i["asset_id"]] for i in items], items)
+        error_msg = next((e for e in s3_errors if e), None)
+        if error_msg:
+            # Hand the claim back so the client can retry the completion
+            MediaAsset.objects.filter(id__in=assets.keys()).update(processing_status="queued")
+            return error_response(f"AWS S3 Error: {error_msg}", status=400)
+
+        # 4. Dispatch to the kind-specific worker (anything unknown is a generic file).
+        # A group publishes the whole album over one broker connection checkout; either
+        # way the publish runs off the request thread.
+        signatures = [KIND_TO_TASK.get(a.kind, process_file_task).s(a.id) for a in assets.values()]
+        publish_task(signatures[0] if len(signatures) == 1 else group(signatures))
+
+        if len(items) == 1:
+            return success_response({
+                "message": "Upload completed, processing started.",
+                "asset_id": asset_ids[0]
+            })
         return success_response({
-            "message": "Upload completed, processing started.",
-            "asset_id": asset.id
+            "message": "Uploads completed, processing started.",
+            "asset_ids": asset_ids
         })
+
+
+def _complete_multipart(asset, item):
+    """Returns an error message, or None when there was nothing to do / it succeeded."""
+    if not (item.get("parts") and item.get("upload_id")):
+        return None
+    try:
+        s3.complete_multipart_upload(
+            Bucket=asset.bucket, 
+            Key=asset.object_key, 
+            UploadId=item["upload_id"], 
+            MultipartUpload={"Parts": item["parts"]}
+        )
+    except ClientError as e:
+        return e.response['Error']['Message'] if 'Error' in e.response else str(e)
+    return None
     
 
 class SignBatchView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        ser = SignBatchInSerializer(data=request.data)
-        if not ser.is_valid():
-            return error_response(errors=ser.errors, status=400)
+        d, errors = parse(SignBatchIn, request.data)
+        if errors:
+            return error_response(errors=errors, status=400)
         
-        d = ser.validated_data
         upload_id = d["upload_id"]
         object_key = d["object_key"]
         start = d["start_part"]
         count = d["batch_count"]
 
-        items = []
-        for pn in range(start, start + count):
-            url = s3.generate_presigned_url(
-                ClientMethod="upload_part",
-                Params={
-                    "Bucket": AWS_BUCKET, 
-                    "Key": object_key, 
-                    "UploadId": upload_id, 
-                    "PartNumber": pn
-                },
-                ExpiresIn=DEFAULT_EXPIRES_PART,
-            )
-            items.append({"part_number": pn, "url": url})
-            
         return success_response(
             message="Batch signed",
             data={
                 "object_key": object_key,
                 "upload_id": upload_id,
-                "batch": {
-                    "items": items
-                }
+                "batch": ChatService.sign_part_window(object_key, upload_id, start, count),
             },
             status=200
         )
@@ -191,11 +220,10 @@ class ForwardMessageView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        ser = ForwardMessageInSerializer(data=request.data)
-        if not ser.is_valid():
-            return error_response(errors=ser.errors, status=400)
+        d, errors = parse(ForwardMessageIn, request.data)
+        if errors:
+            return error_response(errors=errors, status=400)
         
-        d = ser.validated_data
         count = ChatService.forward_message_batch(
             sender=request.user,
             original_message_id=d['message_id'],
@@ -208,52 +236,92 @@ class ForwardMessageView(APIView):
             status=200
         )
 
+def _partner_columns(side):
+    """ChatListView .values() expressions for the partner on `side` ('participant_1' / 'participant_2')."""
+    return {
+        'partner_id': F(f'{side}_id'),
+        'partner_email': F(f'{side}__email'),
+        'partner_full_name': F(f'{side}__full_name'),
+        'partner_avatar_bucket': F(f'{side}__avatar_bucket'),
+        'partner_avatar_key': F(f'{side}__avatar_key'),
+    }
+
+
 class ChatListView(APIView):
     permission_classes = [IsAuthenticated]
     pagination_class = ChatListCursorPagination
 
     def get(self, request):
         user_id = request.user.id
+        paginator = self.pagination_class()
 
-        queryset = Conversation.objects.filter(
-            Q(participant_1=user_id) | Q(participant_2=user_id)
-        ).annotate(
-            partner_id=Case(
-                When(participant_1=user_id, then=F('participant_2')),
-                default=F('participant_1')
-            )
-        ).order_by('-updated_at')
+        # The first page is what every app launch asks for: serve it from Redis while
+        # no conversation of this user has changed (see ChatListCache).
+        first_page = paginator.cursor_query_param not in request.query_params
+        if first_page:
+            version, cached = ChatListCache.read(user_id)
+            if cached is not None:
+                return self._cached_response(request, paginator, user_id, cached)
+
+        # Two index scans on (participant_X, -updated_at) merged with UNION ALL,
+        # rather than OR + CASE which forces a filter-then-sort over every row.
+        # Rows come back as dicts (.values): no Conversation model instantiation per row.
+        # Each branch knows which side the user is on, so the partner's profile columns
+        # (a PK join) and my_unread are resolved in SQL and the serializer does no per-row branching.
+        # (explicit ->> : KeyTextTransform would read a numeric key like "42" as an array index)
+        unread_text = Func(F('unread_counts'), Value(str(user_id), output_field=TextField()),
+                           arg_joiner=' ->> ', template='(%(expressions)s)', output_field=TextField())
+        my_unread = Coalesce(Cast(unread_text, IntegerField()), 0)
+        queryset = UnionAllQuerySet(
+            Conversation.objects.filter(participant_1=user_id).values(
+                *CHAT_LIST_FIELDS, **_partner_columns('participant_2'), my_unread=my_unread
+            ),
+            Conversation.objects.filter(participant_2=user_id).exclude(participant_1=user_id).values(
+                *CHAT_LIST_FIELDS, **_partner_columns('participant_1'), my_unread=my_unread
+            ),
+        )
 
-        paginator = self.pagination_class()
         page = paginator.paginate_queryset(queryset, request, view=self)
 
         if page is not None:
-            partner_ids = [getattr(obj, 'partner_id') for obj in page]
-
-            user_objects = User.objects.filter(id__in=partner_ids)
-            user_map = {u.id: u for u in user_objects}
-
-            online_status_map = {}
-            if partner_ids:
-                online_status_map = async_to_sync(ChatRedisService.subscribe_and_get_presences)(
-                    observer_id=user_id,
-                    target_ids=partner_ids
-                )
-
-            serializer = ChatListSerializer(
-                page, 
-                many=True, 
-                context={
-                    'request': request,
-                    'online_status_map': online_status_map,
-                    'user_map': user_map
-                }
+            # Partner profiles came back joined onto the page; only presence is left (one pipeline)
+            online_status_map = ChatRedisService.subscribe_and_get_presences_sync(
+                observer_id=user_id,
+                target_ids=[row['partner_id'] for row in page]
             )
-            
-            return paginator.get_paginated_response(serializer.data)
+
+            data = serialize_chat_list(page, online_status_map)
+            response = paginator.get_paginated_response(data)
+            if first_page:
+                next_link = paginator.get_next_link()
+                next_cursor = parse_qs(urlsplit(next_link).query)[paginator.cursor_query_param][0] if next_link else None
+                ChatListCache.store(user_id, version, {'conversations': data, 'next_cursor': next_cursor})
+            return response
 
         return paginator.get_paginated_response([])
-    
+
+    @staticmethod
+    def _cached_response(request, paginator, user_id, cached):
+        data = cached['conversations']
+        partner_ids = [entry['partner']['id'] for entry in data]
+
+        # Only the live parts are refreshed: presence, and profiles from the
+        # in-process cache (kept current by the user:invalidate Pub/Sub channel)
+        online_status_map = ChatRedisService.subscribe_and_get_presences_sync(
+            observer_id=user_id, target_ids=partner_ids
+        )
+        profiles = UserProfileService.get_profiles(partner_ids)
+        for entry in data:
+            pid = entry['partner']['id']
+            entry['partner'] = profiles.get(pid, entry['partner'])
+            entry['is_online'] = online_status_map.get(pid, False)
+
+        next_cursor = cached['next_cursor']
+        next_link = None
+        if next_cursor:
+            next_link = replace_query_param(request.build_absolute_uri(), paginator.cursor_query_param, next_cursor)
+        return paginator.build_response(data, next_link)
+
 class ChatMessageListView(APIView):
     permission_classes = [IsAuthenticated]
     pagination_class = MessageCursorPagination
@@ -261,26 +329,39 @@ class ChatMessageListView(APIView):
     def get(self, request, partner_id):
         user_id = request.user.id
         p1, p2 = sorted([user_id, partner_id])
-        
-        try:
-            conversation = Conversation.objects.get(participant_1_id=p1, participant_2_id=p2)
-        except Conversation.DoesNotExist:
-            return self.pagination_class().get_paginated_response([])
 
+        # Filter through the JOIN instead of fetching the Conversation first:
+        # no conversation row simply means an empty page.
         queryset = ChatMessage.objects.filter(
-            conversation=conversation
+            conversation__participant_1_id=p1,
+            conversation__participant_2_id=p2
         ).exclude(
             sender_id=partner_id, 
             status=ChatMessage.Status.FAILED
-        ).select_related('reply_to').prefetch_related('media_assets').order_by('-created_at')
+        ).select_related('conversation').only(
+            # Exactly what ChatMessageListSerializer reads (reply_to renders as its pk)
+            'id', 'conversation_id', 'sender_id', 'content', 'message_type', 'status',
+            'created_at', 'is_edited', 'is_forwarded', 'forward_source_name',
+            'reply_to_id', 'reply_metadata', 'asset_count',
+            # For the read receipt on the first page
+            'conversation__id', 'conversation__unread_counts',
+        ).prefetch_related(
+            Prefetch('media_assets', queryset=MediaAsset.objects.only(
+                'id', 'message_id', 'bucket', 'object_key', 'kind', 'variants',
+                'width', 'height', 'duration_seconds', 'file_name', 'file_size', 'processing_status'
+            ))
+        ).order_by('-created_at')
 
         paginator = self.pagination_class()
         page = paginator.paginate_queryset(queryset, request, view=self)
 
+        if not page:
+            return paginator.get_paginated_response([])
+
         latest_msg_id = None
         is_first_page = request.query_params.get('cursor') is None
         
-        if is_first_page and page:
+        if is_first_page:
             top_msg = page[0]
 
             if top_msg.sender_id == partner_id:
@@ -289,7 +370,7 @@ class ChatMessageListView(APIView):
         if latest_msg_id:
             ChatService.mark_messages_as_read(
                 request.user, 
-                conversation, 
+                page[0].conversation, 
                 partner_id, 
                 latest_message_id=latest_msg_id
             )
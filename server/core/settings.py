@@ -174,6 +174,7 @@ CACHES = {
         "LOCATION": os.getenv('CACHE_URL'),
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "CONNECTION_POOL_KWARGS": {"max_connections": 128},
         }
     }
 }
@@ -182,8 +183,14 @@ CACHES = {
 # Celery settings
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL')
 CELERY_RESULT_BACKEND = os.getenv('CELERY_BROKER_URL')
-CELERY_ACCEPT_CONTENT = ['json']
-CELERY_TASK_SERIALIZER = 'json'
+# msgpack: smaller and faster to encode than JSON. Task args are plain ints/strings/dicts.
+# 'json' stays accepted so messages queued before a deploy still get consumed.
+CELERY_ACCEPT_CONTENT = ['msgpack', 'json']
+CELERY_TASK_SERIALIZER = 'msgpack'
+CELERY_RESULT_SERIALIZER = 'msgpack'
+CELERY_RESULT_ACCEPT_CONTENT = ['msgpack', 'json']
+# Keep producer sockets warm so request-path publishes skip the TCP handshake
+CELERY_BROKER_TRANSPORT_OPTIONS = {'socket_keepalive': True, 'health_check_interval': 30}
 
 
 # JWT Authentication settings
@@ -191,6 +198,10 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "utils.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "EXCEPTION_HANDLER": "middlewares.exception_handler.custom_exception_handler"
 }
 
@@ -253,6 +264,36 @@ AWS_S3_ENDPOINT_URL = os.getenv('AWS_S3_ENDPOINT_URL')
 if AWS_ACCESS_KEY_ID is None:
     print("⚠️ WARNING: AWS_ACCESS_KEY_ID is missing. S3 uploads will fail.")
 
+# ------------------------------------------------------------------------------
+# LOGGING
+# ------------------------------------------------------------------------------
+# Records are handed to a queue and written by a listener thread, so a burst of
+# errors never serializes request threads on the stdout lock.
+LOG_LEVEL = os.getenv("DJANGO_LOG_LEVEL", "INFO" if DEBUG else "WARNING")
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "queued": {
+            "()": "utils.log_queue.queued_stream_handler",
+            "fmt": "%(asctime)s %(levelname)s %(name)s: %(message)s",
+        },
+    },
+    "loggers": {
+        # Replaces Django's default console/mail_admins pair, which also propagates
+        # to root: under DEBUG every django.request error was printed twice
+        "django": {
+            "handlers": ["queued"],
+            "level": LOG_LEVEL,
+            "propagate": False,
+        },
+    },
+    "root": {
+        "handlers": ["queued"],
+        "level": LOG_LEVEL,
+    },
+}
+
 # Silence drf-yasg deprecation warning
 SWAGGER_USE_COMPAT_RENDERERS = False
 
@@ -1,5 +1,4 @@
-from rest_framework_simplejwt.tokens import AccessToken
-from utils.jwt_util import verify_token_signature
+from utils.jwt_util import decode_access_token, verify_token_signature
 from django.http import JsonResponse
 
 class JWTClientBindingMiddleware:
@@ -7,12 +6,13 @@ class JWTClientBindingMiddleware:
         self.get_response = get_response
 
     def __call__(self, request):
-        auth = request.headers.get('Authorization', '')
-        parts = auth.split(' ')
-        if parts[0] == 'Bearer' and len(parts) == 2:
-            token = parts[1]
+        # Raw WSGI key: skips building the case-insensitive request.headers mapping
+        auth = request.META.get('HTTP_AUTHORIZATION')
+        # Exactly "Bearer <token>", as before; anything else passes through untouched
+        if auth is not None and auth.startswith('Bearer ') and auth.find(' ', 7) < 0:
+            token = auth[7:]
             try:
-                decoded = AccessToken(token)
+                decoded = decode_access_token(token)
                 if not verify_token_signature(decoded, request):
                     return JsonResponse({
                         "success": False,
@@ -1,7 +1,10 @@
+import logging
+
 from utils.response import error_response
 from rest_framework.views import exception_handler
 
-import traceback
+logger = logging.getLogger(__name__)
+
 
 def custom_exception_handler(exc, context):
     response = exception_handler(exc, context)
@@ -11,12 +14,9 @@ def custom_exception_handler(exc, context):
             errors=response.data,
             status=response.status_code
         )
-        
-    # --- ADD THIS DEBUG BLOCK ---
-    print("\n!!! SERVER CRASH DETECTED !!!")
-    print(f"Exception Type: {type(exc)}")
-    print(f"Exception Message: {exc}")
-    traceback.print_exc() # <--- This prints the line number where it crashed
-    # ----------------------------
-    
+
+    # Goes through the queued log handler: the traceback is formatted and written
+    # by the listener thread, not on the request thread holding the stdout lock
+    view = context.get("view")
+    logger.exception("Unhandled exception in %s", type(view).__name__ if view else "unknown")
     return error_response("Internal server error", status=500)
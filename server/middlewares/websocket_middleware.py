@@ -1,4 +1,4 @@
-from urllib.parse import parse_qs
+from urllib.parse import unquote_to_bytes
 from channels.db import database_sync_to_async
 from channels.middleware import BaseMiddleware
 
@@ -14,22 +14,58 @@ class ASGIRequestAdapter:
 
 @database_sync_to_async
 def get_user_from_token(token):
-    from rest_framework_simplejwt.tokens import AccessToken
     from django.contrib.auth.models import AnonymousUser
     from users.models import ChatUser
+    from utils.jwt_util import decode_access_token
     if not token:
         return AnonymousUser()
     try:
-        decoded = AccessToken(token)
-        user_id = decoded["user_id"]
-        return ChatUser.objects.get(id=user_id)
+        # The token verify is cached in jwt_util; the user row is read on every
+        # handshake so deleted or deactivated users are refused immediately.
+        # Consumers only need the id, so load nothing else.
+        user = ChatUser.objects.only("id", "is_active").get(id=decode_access_token(token)["user_id"])
     except Exception:
         return AnonymousUser()
+    return user if user.is_active else AnonymousUser()
+
+def token_from_query(query_string):
+    """
+    First `token` value in a raw query string, or None.
+    Scans the bytes directly instead of building parse_qs()'s dict of lists
+    on every handshake; only the captured value is percent-decoded.
+    """
+    i = query_string.find(b"token=")
+    while i > 0 and query_string[i - 1] != ord("&"):  # must start a key, not end one ("xtoken=")
+        i = query_string.find(b"token=", i + 1)
+    if i < 0:
+        return None
+    value = query_string[i + 6:].split(b"&", 1)[0]
+    # "replace" as parse_qs() did: a stray %FF must not raise inside the handshake
+    return unquote_to_bytes(value).decode("utf-8", "replace") or None
+
+class LazyUser:
+    """
+    Awaitable stand-in for scope["user"]. The token is verified and the user
+    loaded on the first await, so handshakes that never reach a consumer
+    (unrouted paths, health checks) skip the thread hop and DB lookup.
+    """
+    __slots__ = ("_token", "_user")
+
+    def __init__(self, token):
+        self._token = token
+        self._user = None
+
+    def __await__(self):
+        return self._resolve().__await__()
+
+    async def _resolve(self):
+        if self._user is None:
+            self._user = await get_user_from_token(self._token)
+        return self._user
 
 class JWTClientBindingASGIMiddleware(BaseMiddleware):
     async def __call__(self, scope, receive, send):
-        query_string = scope.get("query_string", b"").decode()
-        token = parse_qs(query_string).get("token", [None])[0]
-        
-        scope["user"] = await get_user_from_token(token)
+        token = token_from_query(scope.get("query_string", b""))
+
+        scope["user"] = LazyUser(token)
         return await super().__call__(scope, receive, send)
@@ -0,0 +1,30 @@
+from unittest.mock import Mock
+from background_worker import publish
+
+
+def _drain():
+    # Single publisher thread: once this no-op has run, everything before it has too
+    publish._publisher.submit(lambda: None).result()
+
+
+def test_publish_task_applies_signatures_in_order():
+    calls = []
+    first, second = Mock(), Mock()
+    first.apply_async.side_effect = lambda: calls.append("first")
+    second.apply_async.side_effect = lambda: calls.append("second")
+
+    publish.publish_task(first)
+    publish.publish_task(second)
+    _drain()
+
+    assert calls == ["first", "second"]
+
+
+def test_publish_task_logs_instead_of_raising(caplog):
+    signature = Mock()
+    signature.apply_async.side_effect = ConnectionError("broker down")
+
+    publish.publish_task(signature)
+    _drain()
+
+    assert "Background task publish failed" in caplog.text
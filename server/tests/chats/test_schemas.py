@@ -0,0 +1,43 @@
+import pytest
+from chats.schemas import parse, SendMessageIn, SignBatchIn, ForwardMessageIn
+
+ATTACHMENT = {"file_name": "a.jpg", "file_size": 10, "content_type": "image/jpeg", "kind": "image"}
+BIG = 10 * 1024 * 1024
+PART = 5 * 1024 * 1024
+
+
+def test_text_is_trimmed_like_drf():
+    data, errors = parse(SendMessageIn, {"receiver_id": 2, "text": "  hi  "})
+    assert errors is None
+    assert data["text"] == "hi"
+
+
+@pytest.mark.parametrize("model, payload, expected", [
+    (SendMessageIn, {"receiver_id": True, "text": "x"}, {"receiver_id": ["A valid integer is required."]}),
+    (SendMessageIn, {"text": "x"}, {"receiver_id": ["This field is required."]}),
+    (SendMessageIn, {"receiver_id": 2, "text": "   "},
+     {"non_field_errors": ["Message must have either text or attachments."]}),
+    (SendMessageIn, {"receiver_id": 2, "attachments": [dict(ATTACHMENT, file_name="", content_type=" ")]},
+     {"attachments": {"0": {"file_name": ["This field may not be blank."],
+                            "content_type": ["This field may not be blank."]}}}),
+    (SendMessageIn, {"receiver_id": 2, "attachments": [dict(ATTACHMENT, file_size=BIG)]},
+     {"attachments": {"0": {"client_part_size": ["Required for files > 5MB"]}}}),
+    (SendMessageIn, {"receiver_id": 2, "attachments": [
+        dict(ATTACHMENT, file_size=BIG, client_part_size=PART, client_num_parts=3)]},
+     {"attachments": {"0": {"client_num_parts": ["Mismatch. Expected 2 parts."]}}}),
+    (SignBatchIn, {"upload_id": "", "object_key": "k"}, {"upload_id": ["This field may not be blank."]}),
+    (ForwardMessageIn, {"message_id": 1, "receiver_ids": [2], "text": None},
+     {"text": ["This field may not be null."]}),
+    (ForwardMessageIn, {"message_id": 1, "receiver_ids": [2, "z"]},
+     {"receiver_ids": {"1": ["A valid integer is required."]}}),
+])
+def test_errors_match_drf_shape_and_messages(model, payload, expected):
+    data, errors = parse(model, payload)
+    assert data is None
+    assert errors == expected
+
+
+def test_forward_without_text_keeps_original():
+    data, errors = parse(ForwardMessageIn, {"message_id": 1, "receiver_ids": [2]})
+    assert errors is None
+    assert data["text"] is None
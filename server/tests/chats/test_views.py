@@ -1,12 +1,27 @@
+import base64
 import pytest
-from unittest.mock import patch
+from unittest.mock import Mock, patch
+from botocore.exceptions import ClientError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from tests.constants import *
-from chats.models import ChatMessage, MediaAsset
+from chats.models import ChatMessage, MediaAsset, Conversation
 
 
 @pytest.mark.django_db
 class TestUploadViews:
 
+    @pytest.fixture(autouse=True)
+    def mock_s3(self):
+        # Views never reach S3 in these tests; one mock per test, shared by all of them
+        with patch("chats.views.s3") as s3:
+            yield s3
+
+    @pytest.fixture
+    def mock_publish(self):
+        with patch("chats.views.publish_task") as publish:
+            yield publish
+
     def test_prepare_upload_direct_success(self, auth_client, user, another_user):
         """
         Scenario: User requests upload for a small file (Direct Mode).
@@ -78,32 +93,287 @@ class TestUploadViews:
         assert data["mode"] == "multipart"
         assert data["upload_id"] == "test_upload_id_123"
 
-    def test_complete_upload_triggers_worker(self, auth_client, media_asset):
+    def test_complete_upload_triggers_worker(self, auth_client, media_asset, mock_s3, mock_publish):
         """
         Scenario: Client finishes upload and calls 'complete'.
         """
         payload = {
-            "object_key": media_asset.object_key,
+            "asset_id": media_asset.id,
             "upload_id": "dummy_id",
             "parts": [{"ETag": "123", "PartNumber": 1}]
         }
+        mock_task = Mock()
 
-        with patch("chats.views.process_uploaded_asset.delay") as mock_task, \
-             patch("chats.views.notify_message_event.delay") as mock_notify, \
-             patch("chats.views.s3"):
-            
-            # FIX: Use format='json' (Solves "Expected dict got str" error)
+        with patch.dict("chats.views.KIND_TO_TASK", {MediaAsset.Kind.IMAGE: mock_task}):
             response = auth_client.post(COMPLETE_URL, payload, format='json')
 
-            if response.status_code != 200:
-                print("DEBUG ERROR:", response.json())
-
         assert response.status_code == 200
         assert response.json()["success"] is True
 
-        mock_task.assert_called_once_with(media_asset.id)
-        mock_notify.assert_called_once()
-        
+        mock_s3.complete_multipart_upload.assert_called_once()
+        mock_task.s.assert_called_once_with(media_asset.id)
+        mock_publish.assert_called_once_with(mock_task.s.return_value)
+        media_asset.refresh_from_db()
+        assert media_asset.processing_status == "running"
+
+    def test_complete_upload_twice_dispatches_once(self, auth_client, media_asset, mock_publish):
+        mock_task = Mock()
+
+        with patch.dict("chats.views.KIND_TO_TASK", {MediaAsset.Kind.IMAGE: mock_task}):
+            first = auth_client.post(COMPLETE_URL, {"asset_id": media_asset.id}, format='json')
+            second = auth_client.post(COMPLETE_URL, {"asset_id": media_asset.id}, format='json')
+
+        assert first.status_code == 200
+        assert second.status_code == 404
+        mock_task.s.assert_called_once_with(media_asset.id)
+
+    def test_complete_upload_rejects_other_users_asset(self, auth_client, another_user, user, media_asset, mock_s3):
+        ChatMessage.objects.filter(id=media_asset.message_id).update(sender=another_user, receiver=user)
+
+        response = auth_client.post(COMPLETE_URL, {"asset_id": media_asset.id}, format='json')
+
+        assert response.status_code == 403
+        mock_s3.complete_multipart_upload.assert_not_called()
+        media_asset.refresh_from_db()
+        assert media_asset.processing_status == "queued"
+
+    def test_complete_upload_album_claims_all_or_nothing(self, auth_client, media_asset, mock_publish):
+        running = MediaAsset.objects.create(
+            message_id=media_asset.message_id, kind="image", bucket="test-bucket",
+            object_key="raw_uploads/second.jpg", processing_status="running",
+        )
+        payload = {"items": [{"asset_id": media_asset.id}, {"asset_id": running.id}]}
+
+        response = auth_client.post(COMPLETE_URL, payload, format='json')
+
+        assert response.status_code == 404
+        mock_publish.assert_not_called()
+        media_asset.refresh_from_db()
+        assert media_asset.processing_status == "queued"
+
+    def test_complete_upload_s3_error_releases_claim(self, auth_client, media_asset, mock_s3):
+        payload = {"asset_id": media_asset.id, "upload_id": "dummy_id", "parts": [{"ETag": "1", "PartNumber": 1}]}
+        mock_s3.complete_multipart_upload.side_effect = ClientError(
+            {"Error": {"Code": "NoSuchUpload", "Message": "gone"}}, "CompleteMultipartUpload"
+        )
+
+        response = auth_client.post(COMPLETE_URL, payload, format='json')
+
+        assert response.status_code == 400
+        media_asset.refresh_from_db()
+        assert media_asset.processing_status == "queued"
+
     def test_prepare_upload_requires_auth(self, client):
         response = client.post(PREPARE_URL, {}, format='json')
-        assert response.status_code == 401
\ No newline at end of file
+        assert response.status_code == 401
+
+@pytest.mark.django_db
+class TestSendMessageView:
+
+    def test_send_message_multipart_init_signs_first_window_only(self, auth_client, user, another_user):
+        """
+        Scenario: User sends a LARGE attachment.
+        Expectation: Init creates the S3 multipart upload and signs only the first
+        INIT_SIGN_WINDOW parts; the rest come from sign-batch as the client progresses.
+        """
+        payload = {
+            "receiver_id": another_user.id,
+            "attachments": [{
+                "file_name": "movie.mp4",
+                "file_size": 60 * 1024 * 1024,
+                "content_type": "video/mp4",
+                "kind": "video",
+                "client_part_size": 5 * 1024 * 1024,
+                "client_num_parts": 12
+            }]
+        }
+
+        with patch("chats.services.s3") as mock_s3, \
+             patch("chats.services.sync_redis_client") as mock_redis, \
+             patch("chats.services.ChatService._broadcast_message"):
+
+            # Pipelined (SCARD viewing, SISMEMBER online) -> receiver is offline
+            mock_redis.pipeline.return_value.execute.return_value = [0, False]
+            mock_s3.create_multipart_upload.return_value = {"UploadId": "test_upload_id_123"}
+
+            response = auth_client.post(SEND_MESSAGE_URL, payload, format='json')
+
+        assert response.status_code == 201
+        upload = response.json()["data"]["uploads"][0]
+
+        assert upload["mode"] == "multipart"
+        assert upload["upload_id"] == "test_upload_id_123"
+        assert upload["num_parts"] == 12
+        batch = upload["batch"]
+        assert [i["part_number"] for i in batch["items"]] == list(range(1, 9))
+        assert "uploadId=test_upload_id_123" in batch["items"][0]["url"]
+        assert batch["next_start_hint"] == 9
+
+    def test_send_message_aborts_multipart_upload_when_insert_fails(self, auth_client, another_user):
+        """
+        Scenario: The multipart upload is created, then SEND_MEDIA_SQL fails.
+        Expectation: The request errors and the orphaned S3 upload is aborted.
+        """
+        payload = {
+            "receiver_id": another_user.id,
+            "attachments": [{
+                "file_name": "movie.mp4",
+                "file_size": 60 * 1024 * 1024,
+                "content_type": "video/mp4",
+                "kind": "video",
+                "client_part_size": 5 * 1024 * 1024,
+                "client_num_parts": 12
+            }]
+        }
+
+        with patch("chats.services.s3") as mock_s3, \
+             patch("chats.services.SEND_MEDIA_SQL", "SELECT 1 / 0"), \
+             patch("chats.services.ChatService._broadcast_message") as mock_broadcast:
+
+            mock_s3.create_multipart_upload.return_value = {"UploadId": "test_upload_id_123"}
+
+            response = auth_client.post(SEND_MESSAGE_URL, payload, format='json')
+
+        assert response.status_code == 500
+        key = mock_s3.create_multipart_upload.call_args.kwargs["Key"]
+        mock_s3.abort_multipart_upload.assert_called_once_with(
+            Bucket=mock_s3.create_multipart_upload.call_args.kwargs["Bucket"],
+            Key=key,
+            UploadId="test_upload_id_123",
+        )
+        mock_broadcast.assert_not_called()
+
+    def test_send_album_writes_message_and_assets_in_one_statement(self, auth_client, user, another_user):
+        payload = {
+            "receiver_id": another_user.id,
+            "text": "trip",
+            "attachments": [
+                {"file_name": "a.jpg", "file_size": 1024, "content_type": "image/jpeg", "kind": "image"},
+                {"file_name": "b.mp3", "file_size": 2048, "content_type": "audio/mpeg", "kind": "audio"},
+            ],
+        }
+
+        with patch("chats.services.presign_put_object", return_value="https://s3-fake-url"), \
+             patch("chats.services.sync_redis_client") as mock_redis, \
+             patch("chats.services.ChatService._broadcast_message"), \
+             CaptureQueriesContext(connection) as ctx:
+            mock_redis.pipeline.return_value.execute.return_value = [0, False]
+            response = auth_client.post(SEND_MESSAGE_URL, payload, format='json')
+
+        assert response.status_code == 201
+        writes = [q["sql"] for q in ctx.captured_queries if q["sql"].lstrip().upper().startswith(("WITH", "INSERT", "UPDATE"))]
+        assert len(writes) == 1
+
+        data = response.json()["data"]
+        msg = ChatMessage.objects.get(id=data["message_id"])
+        assert (msg.message_type, msg.asset_count, msg.content) == ("album", 2, "trip")
+        assert msg.conversation.last_message_type == "album"
+        assert msg.conversation.unread_counts[str(another_user.id)] == 1
+        # Each upload instruction carries the id of the asset row for its object key
+        assets = {a.id: a for a in MediaAsset.objects.filter(message=msg)}
+        assert {u["asset_id"]: u["object_key"] for u in data["uploads"]} == {i: a.object_key for i, a in assets.items()}
+        assert {a.kind for a in assets.values()} == {"image", "audio"}
+
+
+@pytest.mark.django_db
+class TestChatListView:
+
+    @pytest.fixture(autouse=True)
+    def chat_list_cache(self):
+        # Cold cache unless a test says otherwise
+        with patch("chats.views.ChatListCache") as cache:
+            cache.read.return_value = (0, None)
+            yield cache
+
+    def test_unread_count_and_partner_resolved_per_side(self, auth_client, user, another_user, third_user):
+        # user is participant_2 here and participant_1 below: both UNION branches
+        Conversation.objects.create(
+            participant_1=another_user, participant_2=user,
+            unread_counts={str(user.id): 3, str(another_user.id): 1},
+        )
+        Conversation.objects.create(participant_1=user, participant_2=third_user, unread_counts={})
+
+        with patch("chats.views.ChatRedisService.subscribe_and_get_presences_sync", return_value={}):
+            response = auth_client.get(CHAT_LIST_URL)
+
+        assert response.status_code == 200
+        rows = {c["partner"]["id"]: c for c in response.json()["data"]["conversations"]}
+        assert rows[another_user.id]["unread_count"] == 3
+        assert rows[third_user.id]["unread_count"] == 0
+
+    def test_single_query_and_no_count(self, auth_client, user, another_user):
+        Conversation.objects.create(participant_1=user, participant_2=another_user)
+
+        with patch("chats.views.ChatRedisService.subscribe_and_get_presences_sync", return_value={}), \
+             CaptureQueriesContext(connection) as ctx:
+            response = auth_client.get(CHAT_LIST_URL)
+
+        assert response.status_code == 200
+        conv_queries = [q["sql"] for q in ctx.captured_queries if "chats_conversation" in q["sql"]]
+        # Keyset page + joined partner profiles in one UNION ALL statement, never a COUNT(*)
+        assert len(conv_queries) == 1
+        sql = conv_queries[0].upper()
+        assert "COUNT(" not in sql
+        # Two per-participant index scans merged, never an OR across both columns
+        assert "UNION ALL" in sql
+        assert " OR " not in sql
+
+    def test_cache_miss_stores_first_page_under_version_read(self, auth_client, user, another_user, chat_list_cache):
+        Conversation.objects.create(participant_1=user, participant_2=another_user)
+        chat_list_cache.read.return_value = (7, None)
+
+        with patch("chats.views.ChatRedisService.subscribe_and_get_presences_sync", return_value={}):
+            response = auth_client.get(CHAT_LIST_URL)
+
+        assert response.status_code == 200
+        user_id, version, payload = chat_list_cache.store.call_args.args
+        assert (user_id, version) == (user.id, 7)
+        assert payload == {"conversations": response.json()["data"]["conversations"], "next_cursor": None}
+
+    def test_cache_hit_serves_without_sql_and_refreshes_live_fields(self, auth_client, user, another_user, chat_list_cache):
+        stale_partner = {"id": another_user.id, "email": "old@x.com", "full_name": "Old", "avatar_url": None}
+        chat_list_cache.read.return_value = (3, {
+            "conversations": [{"id": 1, "partner": stale_partner, "is_online": False, "unread_count": 2}],
+            "next_cursor": "abc",
+        })
+        fresh_partner = {**stale_partner, "full_name": "New"}
+
+        with patch("chats.views.ChatRedisService.subscribe_and_get_presences_sync",
+                   return_value={another_user.id: True}), \
+             patch("chats.views.UserProfileService.get_profiles", return_value={another_user.id: fresh_partner}), \
+             CaptureQueriesContext(connection) as ctx:
+            response = auth_client.get(CHAT_LIST_URL)
+
+        assert response.status_code == 200
+        assert not [q for q in ctx.captured_queries if "chats_conversation" in q["sql"]]
+        data = response.json()["data"]
+        assert data["conversations"][0]["partner"]["full_name"] == "New"
+        assert data["conversations"][0]["is_online"] is True
+        assert data["conversations"][0]["unread_count"] == 2
+        assert data["next"].endswith("?cursor=abc")
+        chat_list_cache.store.assert_not_called()
+
+    def test_later_pages_bypass_cache(self, auth_client, chat_list_cache):
+        with patch("chats.views.ChatRedisService.subscribe_and_get_presences_sync", return_value={}):
+            # An encoded "p=<updated_at>" position, as the first page's next link carries
+            cursor = base64.b64encode(b"p=2026-01-01T00:00:00Z").decode()
+            response = auth_client.get(CHAT_LIST_URL, {"cursor": cursor})
+
+        assert response.status_code == 200
+        chat_list_cache.read.assert_not_called()
+        chat_list_cache.store.assert_not_called()
+
+
+@pytest.mark.django_db
+class TestSignBatchView:
+
+    def test_default_window_and_prefetch_hints(self, auth_client):
+        payload = {"upload_id": "up-1", "object_key": "uploads/user_1/x/movie.mp4", "start_part": 17}
+
+        response = auth_client.post(SIGN_BATCH_URL, payload, format='json')
+
+        assert response.status_code == 200
+        batch = response.json()["data"]["batch"]
+        assert [i["part_number"] for i in batch["items"]] == list(range(17, 33))
+        assert batch["next_start_hint"] == 33
+        assert batch["prefetch_at_part"] == 25
@@ -4,19 +4,18 @@ import django
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
 django.setup()
 
-import json
+import orjson
 import pytest
 import asyncio
 import importlib
-from unittest.mock import Mock, patch
+from collections import defaultdict
+from functools import lru_cache
+from unittest.mock import MagicMock, Mock, patch
 
-import io
-import boto3
-from PIL import Image
-from moto import mock_aws
 from chats.models import ChatMessage, MediaAsset
 
 from django.conf import settings
+from django.contrib.auth.hashers import get_hashers, get_hashers_by_algorithm
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from rest_framework.test import APIClient
@@ -78,9 +77,11 @@ def issue_bound_token(user, mock_request):
     return token
 
 @pytest.fixture
-def auth_client(issue_bound_token, mock_request):
+def auth_client(user, mock_request):
+    # DRF-level login: no JWT to sign per test, and the binding middleware is skipped
+    # (it only inspects Bearer headers). The middleware has its own tests.
     client = APIClient()
-    client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(issue_bound_token.access_token)}")
+    client.force_authenticate(user=user)
     client.defaults.update({
         "REMOTE_ADDR": mock_request().META.get('REMOTE_ADDR', ''),
         "HTTP_USER_AGENT": mock_request().META.get('HTTP_USER_AGENT', '')
@@ -97,20 +98,42 @@ def get_response():
 
 pytest_plugins = ("pytest_asyncio",)
 
+try:
+    # Shipped with uvicorn[standard]; absent on Windows
+    import uvloop
+except ImportError:
+    uvloop = None
+
+if uvloop is not None:
+    def pytest_asyncio_loop_factories(config, item):
+        # Communicator round trips are asyncio.Queue traffic; uvloop runs them faster
+        return {"uvloop": uvloop.new_event_loop}
+
 @pytest.fixture(autouse=True, scope="session")
 def _configure_settings():
     settings.CHANNEL_LAYERS = {
         "default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}
     }
+    # PBKDF2 takes ~0.5s per create_user(); test passwords need no key stretching
+    settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+    get_hashers.cache_clear()
+    get_hashers_by_algorithm.cache_clear()
+
 
 
 
+_NO_MEMBERS = frozenset()
+
 
 class _FakeRedis:
+    __slots__ = ("sets", "kv", "expiries", "on_expire")
+
     def __init__(self):
         self.sets: dict[str, set] = {}
         self.kv: dict[str, str] = {}
         self.expiries: dict[str, int] = {}
+        # Set whenever a key gets a TTL, so tests can await the write instead of sleeping
+        self.on_expire: defaultdict[str, asyncio.Event] = defaultdict(asyncio.Event)
 
     # set ops
     async def sadd(self, key, member):
@@ -118,22 +141,24 @@ class _FakeRedis:
         return 1
 
     async def srem(self, key, member):
-        if key in self.sets and member in self.sets[key]:
-            self.sets[key].remove(member)
+        members = self.sets.get(key, _NO_MEMBERS)
+        if member in members:
+            members.remove(member)
             return 1
         return 0
 
     async def scard(self, key):
-        return len(self.sets.get(key, set()))
+        return len(self.sets.get(key, _NO_MEMBERS))
 
     async def sismember(self, key, member):
-        return member in self.sets.get(key, set())
+        return member in self.sets.get(key, _NO_MEMBERS)
 
     # string ops
     async def set(self, key, value, ex: int | None = None):
         self.kv[key] = str(value)
         if ex is not None:
             self.expiries[key] = ex
+            self.on_expire[key].set()
 
     async def get(self, key):
         v = self.kv.get(key)
@@ -146,13 +171,14 @@ class _FakeRedis:
     async def expire(self, key, seconds):
         if key in self.kv:
             self.expiries[key] = seconds
+            self.on_expire[key].set()
             return True
         return False
 
     async def keys(self, pattern: str):
         # naive '*' handling: prefix match
         if "*" not in pattern:
-            return [k for k in self.kv.keys() if k == pattern]
+            return [pattern] if pattern in self.kv else []
         prefix = pattern.split("*", 1)[0]
         return [k for k in self.kv.keys() if k.startswith(prefix)]
 
@@ -180,7 +206,7 @@ def patch_redis(monkeypatch, fake_redis):
 
 async def recv_json(communicator, timeout=1.0):
     msg = await asyncio.wait_for(communicator.receive_from(), timeout=timeout)
-    return json.loads(msg)
+    return orjson.loads(msg)
 
 
 async def recv_until(communicator, predicate, timeout=1.5):
@@ -203,7 +229,7 @@ async def recv_type(comm, type_, timeout=1.5):
         per = max(0.01, min(0.2, deadline - asyncio.get_event_loop().time()))
         try:
             raw = await asyncio.wait_for(comm.receive_from(), timeout=per)
-            msg = json.loads(raw)
+            msg = orjson.loads(raw)
             last = msg
             if msg.get("type") == type_:
                 return msg
@@ -213,6 +239,27 @@ async def recv_type(comm, type_, timeout=1.5):
     raise asyncio.TimeoutError(f"Did not receive type={type_}; last={last}")
 
 
+async def recv_typed(comm, *types, timeout=1.5, cache=None):
+    """
+    Collects the first frame of each wanted type in one pass over the socket.
+    Every frame is parsed once; frames of other types are kept in `cache`
+    (by type) so a later call can pick them up without another receive.
+    """
+    cache = {} if cache is None else cache
+    deadline = asyncio.get_event_loop().time() + timeout
+    while not all(t in cache for t in types):
+        remaining = deadline - asyncio.get_event_loop().time()
+        if remaining <= 0:
+            missing = [t for t in types if t not in cache]
+            raise asyncio.TimeoutError(f"Did not receive types={missing}; got={list(cache)}")
+        try:
+            msg = await recv_json(comm, timeout=remaining)
+        except asyncio.TimeoutError:
+            continue
+        cache.setdefault(msg.get("type"), msg)
+    return {t: cache[t] for t in types}
+
+
 
 @pytest.fixture
 def helpers():
@@ -220,6 +267,7 @@ def helpers():
         "recv_json": recv_json,
         "recv_until": recv_until,
         "recv_type": recv_type,
+        "recv_typed": recv_typed,
     }
     
     
@@ -227,12 +275,32 @@ def helpers():
 
 # --- MEDIA & AWS FIXTURES ---
 
+@lru_cache(maxsize=1)
+def _s3_spec():
+    # Built once: only used as a MagicMock spec, never sends a request
+    import boto3
+    return boto3.client("s3", region_name="us-east-1")
+
+
 @pytest.fixture
-def s3_client():
+def s3_client(request):
     """
-    Starts Moto S3, creates the test bucket, and yields the client.
-    This runs for every test function so you get a clean bucket each time.
+    Yields the S3 client for the autouse utils.aws patch.
+    Tests marked @pytest.mark.s3 get Moto S3 with the test bucket created (fresh
+    per test); everything else gets a spec'd MagicMock, since starting Moto costs
+    ~150-250ms per test that never talks to S3.
     """
+    if request.node.get_closest_marker("s3") is None:
+        s3 = MagicMock(spec=_s3_spec())
+        s3.generate_presigned_url.return_value = "https://s3-fake-url"
+        s3.create_multipart_upload.return_value = {"UploadId": "test-upload-id"}
+        yield s3
+        return
+
+    # moto/boto3 are imported here, not at module top, so collection doesn't pay for them
+    import boto3
+    from moto import mock_aws
+
     with mock_aws():
         # 1. Setup Mock S3
         s3 = boto3.client("s3", region_name="us-east-1")
@@ -249,6 +317,9 @@ def raw_image_file():
     Creates a valid 2000x2000 Red JPEG image in memory.
     Returns: io.BytesIO stream
     """
+    import io
+    from PIL import Image
+
     file_stream = io.BytesIO()
     # Create a simple red image
     image = Image.new("RGB", (2000, 2000), color="red")
@@ -10,7 +10,10 @@ EXPLORE_USERS_URL = "/api/auth/explore-users/"
 
 # chats
 PREPARE_URL = "/api/chat/upload/prepare/"
-COMPLETE_URL = "/api/chat/upload/complete/"
+COMPLETE_URL = "/api/chat/complete/"
+SEND_MESSAGE_URL = "/api/chat/send/"
+SIGN_BATCH_URL = "/api/chat/sign-batch/"
+CHAT_LIST_URL = "/api/chat/list/"
 
 DUMMY_PASSWORD = "secret123"
 DUMMY_EMAIL = "test@example.com"
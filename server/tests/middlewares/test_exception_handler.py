@@ -0,0 +1,10 @@
+import logging
+from middlewares.exception_handler import custom_exception_handler
+
+
+def test_unhandled_exception_without_view_logs_unknown(caplog):
+    with caplog.at_level(logging.ERROR, logger="middlewares.exception_handler"):
+        response = custom_exception_handler(RuntimeError("boom"), {})
+
+    assert response.status_code == 500
+    assert caplog.records[0].getMessage() == "Unhandled exception in unknown"
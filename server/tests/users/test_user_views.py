@@ -11,12 +11,13 @@ from users.models import Contact, ChatUser
 from tests.constants import *
 from utils.auth_util import generate_email_token
 from utils.jwt_util import issue_token_for_user
+from background_worker.users.tasks import send_templated_email_task
 
 # --- RegisterUserView Tests ---
 
 @pytest.mark.django_db
-@patch("users.views.send_templated_email_task.delay")
-def test_register_user_success(mock_send_email):
+@patch("users.views.publish_task")
+def test_register_user_success(mock_publish):
     client = APIClient()
     response = client.post(REGISTER_URL, {
         "email": DUMMY_EMAIL,
@@ -28,12 +29,12 @@ def test_register_user_success(mock_send_email):
     assert response.data["success"] is True
     assert response.data["message"] == "User registered"
     
-    mock_send_email.assert_called_once_with(
+    mock_publish.assert_called_once_with(send_templated_email_task.s(
         subject="Welcome to Our Platform!",
         to_email=DUMMY_EMAIL,
         template_name="emails/welcome_email.html",
         context={"user_email": DUMMY_EMAIL}
-    )
+    ))
 
 @pytest.mark.django_db
 def test_register_user_invalid_data():
@@ -48,8 +49,8 @@ def test_register_user_invalid_data():
 # --- SendOTPView Tests ---
 
 @pytest.mark.django_db
-@patch("users.views.send_templated_email_task.delay")
-def test_send_otp_success(mock_send_otp, user):
+@patch("users.views.publish_task")
+def test_send_otp_success(mock_publish, user):
     client = APIClient()
     response = client.post(SEND_OTP_URL, {"email": user.email})
     assert response.status_code == 200
@@ -59,12 +60,12 @@ def test_send_otp_success(mock_send_otp, user):
     cached_otp = cache.get(f"otp_{user.email}")
     assert cached_otp is not None
     
-    mock_send_otp.assert_called_once_with(
+    mock_publish.assert_called_once_with(send_templated_email_task.s(
         subject="Your OTP Code",
         to_email=user.email,
         template_name="emails/otp_email.html",
         context={"otp": cached_otp, "user_email": user.email}
-    )
+    ))
 
 @pytest.mark.django_db
 def test_send_otp_user_not_found():
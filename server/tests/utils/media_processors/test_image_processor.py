@@ -4,6 +4,9 @@ from PIL import Image
 from unittest.mock import patch
 from utils.media_processors.image import ImageProcessor
 
+# Round-trips real objects through S3
+pytestmark = pytest.mark.s3
+
 # We patch the 's3' client imported in base.py to use our moto-backed s3_client
 @pytest.fixture(autouse=True)
 def mock_s3_dependency(s3_client):
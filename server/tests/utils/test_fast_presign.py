@@ -0,0 +1,106 @@
+import re
+import boto3
+import pytest
+from botocore.config import Config
+from utils.fast_presign import sign_upload_part_url, sign_put_object_url, PutObjectPresignContext
+
+
+def _client(region, token=None):
+    return boto3.client(
+        "s3",
+        aws_access_key_id="AKIATEST",
+        aws_secret_access_key="sec/ret+key",
+        aws_session_token=token,
+        region_name=region,
+        # us-east-1 presigns against the global endpoint
+        endpoint_url=None if region == "us-east-1" else f"https://s3.{region}.amazonaws.com",
+        config=Config(signature_version="s3v4", s3={"addressing_style": "virtual"}),
+    )
+
+
+@pytest.mark.parametrize("region", ["us-east-1", "eu-west-2"])
+@pytest.mark.parametrize("key,upload_id", [
+    ("uploads/user_1/abc/My file (1).mp4", "2~xYz.+/=AbC"),
+    ("uploads/user_2/def/ü~.bin", "plain"),
+])
+def test_sign_upload_part_url_matches_botocore(region, key, upload_id):
+    expected = _client(region).generate_presigned_url(
+        "upload_part",
+        Params={"Bucket": "bkt", "Key": key, "UploadId": upload_id, "PartNumber": 7},
+        ExpiresIn=3600,
+    )
+    timestamp = re.search(r"X-Amz-Date=(\w+)", expected).group(1)
+
+    url = sign_upload_part_url(
+        "bkt", key, upload_id, 7, 3600, "AKIATEST", "sec/ret+key", region, timestamp=timestamp
+    )
+
+    assert url == expected
+
+
+@pytest.mark.parametrize("region", ["us-east-1", "eu-west-2"])
+@pytest.mark.parametrize("key,content_type", [
+    ("uploads/user_1/abc/photo (2).jpg", "image/jpeg"),
+    ("uploads/user_2/def/ü~.bin", "application/octet-stream"),
+])
+def test_sign_put_object_url_matches_botocore(region, key, content_type):
+    expected = _client(region).generate_presigned_url(
+        "put_object",
+        Params={"Bucket": "bkt", "Key": key, "ContentType": content_type},
+        ExpiresIn=300,
+    )
+    timestamp = re.search(r"X-Amz-Date=(\w+)", expected).group(1)
+
+    url = sign_put_object_url(
+        "bkt", key, content_type, 300, "AKIATEST", "sec/ret+key", region, timestamp=timestamp
+    )
+
+    assert url == expected
+
+
+def test_put_object_context_reused_across_keys():
+    client = _client("eu-west-2")
+    objects = [("a/one.jpg", "image/jpeg"), ("b/two (2).mp3", "audio/mpeg")]
+
+    # Both botocore URLs must share one X-Amz-Date; retry across a second boundary
+    for _ in range(3):
+        expected = [
+            client.generate_presigned_url(
+                "put_object", Params={"Bucket": "bkt", "Key": k, "ContentType": ct}, ExpiresIn=300
+            )
+            for k, ct in objects
+        ]
+        stamps = {re.search(r"X-Amz-Date=(\w+)", url).group(1) for url in expected}
+        if len(stamps) == 1:
+            break
+
+    ctx = PutObjectPresignContext("bkt", 300, "AKIATEST", "sec/ret+key", "eu-west-2", timestamp=stamps.pop())
+
+    assert [ctx.url_for(k, ct) for k, ct in objects] == expected
+
+
+@pytest.mark.parametrize("token", [None, "FwoGZXIvYXdzE+/token=="])
+def test_session_token_matches_botocore(token):
+    client = _client("eu-west-2", token)
+    expected = client.generate_presigned_url(
+        "upload_part",
+        Params={"Bucket": "bkt", "Key": "a/b.mp4", "UploadId": "up", "PartNumber": 2},
+        ExpiresIn=3600,
+    )
+    timestamp = re.search(r"X-Amz-Date=(\w+)", expected).group(1)
+    expected_put = client.generate_presigned_url(
+        "put_object", Params={"Bucket": "bkt", "Key": "a/c.jpg", "ContentType": "image/jpeg"}, ExpiresIn=300
+    )
+    if re.search(r"X-Amz-Date=(\w+)", expected_put).group(1) != timestamp:
+        pytest.skip("crossed a second boundary between the two botocore calls")
+
+    url = sign_upload_part_url(
+        "bkt", "a/b.mp4", "up", 2, 3600, "AKIATEST", "sec/ret+key", "eu-west-2",
+        timestamp=timestamp, security_token=token,
+    )
+    put_url = sign_put_object_url(
+        "bkt", "a/c.jpg", "image/jpeg", 300, "AKIATEST", "sec/ret+key", "eu-west-2",
+        timestamp=timestamp, security_token=token,
+    )
+
+    assert (url, put_url) == (expected, expected_put)
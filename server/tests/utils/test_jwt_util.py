@@ -46,3 +46,25 @@ def test_verify_token_signature_missing_key(mock_request):
     request = mock_request()
     token = RefreshToken()
     assert verify_token_signature(token, request) is False
+
+
+def test_decode_access_token_caches_verified_claims():
+    import time
+    from unittest.mock import patch
+    from utils import jwt_util
+
+    jwt_util._token_cache.clear()
+    token = Mock(payload={"user_id": 7, "exp": time.time() + 300})
+    with patch("utils.jwt_util.AccessToken", return_value=token) as access_token:
+        assert jwt_util.decode_access_token("a.b.c")["user_id"] == 7
+        assert jwt_util.decode_access_token("a.b.c")["user_id"] == 7
+    assert access_token.call_count == 1
+
+    # Past its own exp the cached entry is ignored and the token re-verified
+    token.payload = {"user_id": 7, "exp": time.time() - 1}
+    jwt_util._token_cache.clear()
+    with patch("utils.jwt_util.AccessToken", return_value=token) as access_token:
+        jwt_util.decode_access_token("a.b.c")
+        jwt_util.decode_access_token("a.b.c")
+    assert access_token.call_count == 2
+    jwt_util._token_cache.clear()
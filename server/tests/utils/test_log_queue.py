@@ -0,0 +1,52 @@
+import io
+import os
+import atexit
+import logging
+from unittest.mock import patch
+from utils.log_queue import queued_stream_handler
+
+
+def _capture(handler):
+    stream = io.StringIO()
+    handler._stream.setStream(stream)
+    logger = logging.getLogger("tests.log_queue")
+    logger.propagate = False
+    logger.addHandler(handler)
+    return logger, stream
+
+
+def _drain(listener):
+    # Flushes the queue; the exit hook would otherwise stop it a second time
+    listener.stop()
+    atexit.unregister(listener.stop)
+
+
+def test_listener_starts_lazily_and_writes_records():
+    handler = queued_stream_handler("%(levelname)s %(message)s")
+    logger, stream = _capture(handler)
+    try:
+        assert handler._listener is None
+        logger.warning("hello")
+        _drain(handler._listener)
+    finally:
+        logger.removeHandler(handler)
+
+    assert stream.getvalue() == "WARNING hello\n"
+
+
+def test_forked_process_starts_its_own_listener():
+    handler = queued_stream_handler("%(message)s")
+    logger, stream = _capture(handler)
+    try:
+        logger.warning("parent")
+        parent_listener = handler._listener
+        # A prefork child inherits the handler but not the parent's listener thread
+        with patch("utils.log_queue.os.getpid", return_value=os.getpid() + 1):
+            logger.warning("child")
+        _drain(parent_listener)
+        _drain(handler._listener)
+    finally:
+        logger.removeHandler(handler)
+
+    assert handler._listener is not parent_listener
+    assert stream.getvalue() == "parent\nchild\n"
@@ -0,0 +1,103 @@
+import re
+import boto3
+import pytest
+from unittest.mock import patch
+from botocore.config import Config
+from utils import s3 as s3_utils
+
+
+def _date(url):
+    return re.search(r"X-Amz-Date=(\w+)", url).group(1)
+
+
+@pytest.fixture(params=[("media-example", True), ("media.example", False)], ids=["fast", "fallback"])
+def role_client(request):
+    # Role credentials (session token); a dotted bucket is off the fast path
+    bucket, fast = request.param
+    session = boto3.session.Session(
+        aws_access_key_id="ASIATEST",
+        aws_secret_access_key="sec/ret+key",
+        aws_session_token="token/+=",
+        region_name="eu-west-2",
+    )
+    client = session.client(
+        "s3", config=Config(signature_version="s3v4", s3={"addressing_style": "virtual"}),
+    )
+    s3_utils._endpoint_base.cache_clear()
+    with patch.object(s3_utils, "s3", client), \
+         patch.object(s3_utils, "_session", session), \
+         patch.object(s3_utils, "AWS_BUCKET", bucket), \
+         patch.object(s3_utils, "AWS_REGION", "eu-west-2"), \
+         patch.object(s3_utils, "FAST_PRESIGN", fast), \
+         patch.object(s3_utils, "USE_MOCK", False):
+        yield client, bucket
+    s3_utils._endpoint_base.cache_clear()
+
+
+def _matching(make_expected, make_actual):
+    # Both sides must land on the same X-Amz-Date second; retry across a boundary
+    for _ in range(3):
+        expected, actual = make_expected(), make_actual()
+        if _date(expected) == _date(actual):
+            break
+    return expected, actual
+
+
+def test_upload_parts_matches_botocore(role_client):
+    client, bucket = role_client
+    key, upload_id = "uploads/user_1/abc/My file ü.mp4", "2~xYz.+/=AbC"
+
+    expected, actual = _matching(
+        lambda: client.generate_presigned_url(
+            "upload_part",
+            Params={"Bucket": bucket, "Key": key, "UploadId": upload_id, "PartNumber": 3},
+            ExpiresIn=3600,
+        ),
+        lambda: s3_utils.presign_upload_parts(key, upload_id, [3])[0]["url"],
+    )
+
+    assert actual == expected
+    assert "X-Amz-Security-Token=" in actual
+
+
+def test_put_object_matches_botocore(role_client):
+    client, bucket = role_client
+    key = "uploads/user_2/def/photo (2).jpg"
+
+    expected, actual = _matching(
+        lambda: client.generate_presigned_url(
+            "put_object",
+            Params={"Bucket": bucket, "Key": key, "ContentType": "image/jpeg"},
+            ExpiresIn=300,
+        ),
+        lambda: s3_utils.presign_put_object(key, "image/jpeg"),
+    )
+
+    assert actual == expected
+
+
+def test_background_refresh_renews_role_credentials_in_advisory_window():
+    from datetime import datetime, timedelta, timezone
+    from botocore.credentials import RefreshableCredentials
+
+    def metadata(key, minutes):
+        expiry = datetime.now(timezone.utc) + timedelta(minutes=minutes)
+        return {"access_key": key, "secret_key": "s", "token": "t", "expiry_time": expiry.isoformat()}
+
+    issued = iter([metadata("ASIANEW", 60)])
+    # 14 minutes left: inside botocore's advisory window, outside the mandatory one
+    credentials = RefreshableCredentials.create_from_metadata(
+        metadata("ASIAOLD", 14), refresh_using=lambda: next(issued), method="sts-assume-role"
+    )
+
+    s3_utils._refresh_if_due(credentials)
+    assert credentials.get_frozen_credentials().access_key == "ASIANEW"
+
+    # Far from expiry: nothing to do (the exhausted iterator would raise)
+    s3_utils._refresh_if_due(credentials)
+
+
+def test_cached_key_signer_is_not_registered_globally():
+    # Other botocore clients in the process keep the stock query signer
+    from botocore import auth as botocore_auth
+    assert botocore_auth.AUTH_TYPE_MAPS["s3v4-query"] is botocore_auth.S3SigV4QueryAuth
@@ -16,13 +16,18 @@ class ChatUser(AbstractUser):
 
     @property
     def avatar_url(self):
-        if not self.avatar_bucket or not self.avatar_key:
+        return ChatUser.build_avatar_url(self.avatar_bucket, self.avatar_key)
+
+    @staticmethod
+    def build_avatar_url(bucket, key):
+        # Static so .values() rows can build the URL without a model instance
+        if not bucket or not key:
             return None
         
         if settings.USE_S3_MOCK:
-            return f"http://localhost:5000/{self.avatar_bucket}/{self.avatar_key}"
+            return f"http://localhost:5000/{bucket}/{key}"
 
-        return f"https://{self.avatar_bucket}.s3.amazonaws.com/{self.avatar_key}"
+        return f"https://{bucket}.s3.amazonaws.com/{key}"
 
 
 
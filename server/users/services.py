@@ -1,12 +1,101 @@
+import time
 import uuid
 import logging
 import mimetypes
+import threading
+from cachetools import TTLCache
 from django.core.cache import cache
 from utils.s3 import s3, AWS_BUCKET, DEFAULT_EXPIRES_DIRECT, generate_presigned_url
+from utils.redis_client import RedisKeys, sync_redis_client
+
+from .models import ChatUser
 
 logger = logging.getLogger(__name__)
 
 
+# --- IN-PROCESS PROFILE CACHE ---
+# Names/avatars rarely change, but the chat list asks for the same partners on
+# every page load. Entries are evicted across all workers via Redis Pub/Sub;
+# the TTL only bounds staleness if an invalidation is ever missed.
+_profile_cache = TTLCache(maxsize=10_000, ttl=300)
+_profile_lock = threading.Lock()
+_listener_started = False
+
+
+def _listen_for_invalidations():
+    while True:
+        try:
+            pubsub = sync_redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(RedisKeys.USER_INVALIDATE)
+            for message in pubsub.listen():
+                with _profile_lock:
+                    _profile_cache.pop(int(message["data"]), None)
+        except Exception:
+            # Invalidations may have been lost while disconnected - start cold.
+            logger.warning("Profile invalidation listener disconnected, retrying", exc_info=True)
+            with _profile_lock:
+                _profile_cache.clear()
+            time.sleep(1)
+
+
+def _ensure_listener():
+    global _listener_started
+    if _listener_started:
+        return
+    with _profile_lock:
+        if _listener_started:
+            return
+        threading.Thread(target=_listen_for_invalidations, name="profile-invalidation", daemon=True).start()
+        _listener_started = True
+
+
+class UserProfileService:
+    @staticmethod
+    def _to_profile(row):
+        # row is a (id, email, full_name, avatar_bucket, avatar_key) tuple from values_list()
+        uid, email, full_name, avatar_bucket, avatar_key = row
+        return {
+            "id": uid,
+            "email": email,
+            "full_name": full_name,
+            "avatar_url": ChatUser.build_avatar_url(avatar_bucket, avatar_key),
+        }
+
+    @staticmethod
+    def get_profiles(user_ids):
+        """
+        Returns {user_id: profile_dict}. Only cache misses hit Postgres.
+        """
+        _ensure_listener()
+
+        profiles = {}
+        with _profile_lock:
+            for uid in user_ids:
+                profile = _profile_cache.get(uid)
+                if profile is not None:
+                    profiles[uid] = profile
+
+        missing = [uid for uid in user_ids if uid not in profiles]
+        if missing:
+            # values_list: plain tuples, no model __init__/descriptor work per row
+            rows = ChatUser.objects.filter(id__in=missing).values_list(
+                "id", "email", "full_name", "avatar_bucket", "avatar_key"
+            )
+            fetched = {row[0]: UserProfileService._to_profile(row) for row in rows}
+            with _profile_lock:
+                _profile_cache.update(fetched)
+            profiles.update(fetched)
+
+        return profiles
+
+    @staticmethod
+    def invalidate(user_id):
+        """Evicts the profile from every worker's cache (including this one)."""
+        with _profile_lock:
+            _profile_cache.pop(user_id, None)
+        sync_redis_client.publish(RedisKeys.USER_INVALIDATE, user_id)
+
+
 class AvatarService:
     @staticmethod
     def generate_avatar_upload_url(user, file_name, content_type):
@@ -71,5 +160,6 @@ class AvatarService:
         user.avatar_bucket = AWS_BUCKET
         user.avatar_key = new_key
         user.save(update_fields=['avatar_bucket', 'avatar_key'])
+        UserProfileService.invalidate(user.id)
 
         return user.avatar_url
\ No newline at end of file
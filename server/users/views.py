@@ -5,7 +5,6 @@ from django.core.cache import cache
 from django.db.models import Q
 
 logger = logging.getLogger(__name__)
-from asgiref.sync import async_to_sync
 
 from rest_framework import status
 from rest_framework.views import APIView
@@ -23,6 +22,7 @@ from utils.response import success_response, error_response
 from utils.auth_util import generate_otp, generate_email_token
 from utils.jwt_util import issue_token_for_user, verify_token_signature
 from background_worker.users.tasks import send_templated_email_task
+from background_worker.publish import publish_task
 
 from .services import AvatarService
 
@@ -44,12 +44,12 @@ class RegisterUserView(APIView):
         serializer = UserRegistrationSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            send_templated_email_task.delay(
+            publish_task(send_templated_email_task.s(
                 subject="Welcome to Our Platform!",
                 to_email=user.email,
                 template_name="emails/welcome_email.html",
                 context={"user_email": user.email}
-            )
+            ))
             return success_response(
                 message="User registered",
                 data={"id": user.id, "email": user.email},
@@ -87,12 +87,12 @@ class SendOTPView(APIView):
 
             email_token = generate_email_token(email)
 
-            send_templated_email_task.delay(
+            publish_task(send_templated_email_task.s(
                 subject="Your OTP Code",
                 to_email=email,
                 template_name="emails/otp_email.html",
                 context={"otp": otp, "user_email": email}
-            )
+            ))
 
             return success_response(
                 message="OTP sent",
@@ -408,7 +408,7 @@ class GetContactsView(APIView):
             if page:
                 contact_user_ids = [c.contact_user_id for c in page]
                 
-                online_status_map = async_to_sync(ChatRedisService.subscribe_and_get_presences)(
+                online_status_map = ChatRedisService.subscribe_and_get_presences_sync(
                     observer_id=request.user.id,
                     target_ids=contact_user_ids
                 )
@@ -1,43 +1,16 @@
 import os
 import uuid
-import boto3
+
+# One S3 client per process: the media processors share utils.s3's client (s3v4,
+# regional, keepalive pool of 100, explicit env credentials) instead of opening a
+# second pool and resolving credentials twice. utils.s3 also creates the Moto bucket.
+from utils.s3 import s3
 
 # Get Env Vars
 AWS_REGION = os.getenv("AWS_S3_REGION_NAME", "us-east-1")
 AWS_BUCKET = os.getenv("AWS_STORAGE_BUCKET_NAME", "test-bucket")
 USE_S3_MOCK = os.getenv("USE_S3_MOCK") == "True"
 
-# Configure Session
-boto_config = {
-    "aws_access_key_id": os.getenv("AWS_ACCESS_KEY_ID"),
-    "aws_secret_access_key": os.getenv("AWS_SECRET_ACCESS_KEY"),
-    "region_name": AWS_REGION,
-}
-
-# 1. Create Resource/Client
-if USE_S3_MOCK:
-    # We are inside Docker, so we connect to the 's3mock' container
-    endpoint = os.getenv("AWS_S3_ENDPOINT_URL", "http://s3mock:5000")
-    
-    s3 = boto3.client(
-        "s3",
-        **boto_config,
-        endpoint_url=endpoint
-    )
-    
-    # AUTO-CREATE BUCKET LOGIC
-    # Moto forgets buckets when restarted, so we must recreate it on startup.
-    try:
-        s3.create_bucket(Bucket=AWS_BUCKET)
-        print(f"✅ [MOCK] Bucket '{AWS_BUCKET}' created on {endpoint}")
-    except Exception as e:
-        pass
-
-else:
-    # Production / Real AWS
-    session = boto3.session.Session(**boto_config)
-    s3 = session.client("s3")
-
 
 def new_object_key(user_id: int, file_name: str) -> str:
     safe = file_name.replace("/", "_")
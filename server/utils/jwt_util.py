@@ -1,6 +1,15 @@
+import time
 import hashlib
+import threading
 
-from rest_framework_simplejwt.tokens import RefreshToken
+from cachetools import TTLCache
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+# A client presents the same access token on every request and reconnect.
+# Verified claims are kept briefly so repeats skip the JWT decode + HMAC check.
+# Keyed by a digest so raw tokens are not held in memory; only valid tokens are cached.
+_token_cache = TTLCache(maxsize=10_000, ttl=60)
+_token_lock = threading.Lock()
 
 
 def get_client_signature(request) -> str:
@@ -25,3 +34,20 @@ def verify_token_signature(token, request) -> bool:
         return client_hash == expected_hash
     except KeyError:
         return False
+
+
+def decode_access_token(token) -> dict:
+    """
+    Verified claims of an access token; raises like AccessToken() if it is invalid.
+    Cached entries are dropped once the token's own `exp` has passed.
+    """
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    with _token_lock:
+        claims = _token_cache.get(key)
+    if claims is not None and claims["exp"] > time.time():
+        return claims
+
+    claims = AccessToken(token).payload
+    with _token_lock:
+        _token_cache[key] = claims
+    return claims
@@ -0,0 +1,50 @@
+import os
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+# Request and worker threads only enqueue log records; one listener thread formats
+# them (tracebacks included) and does the blocking stream write.
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Starts its listener on the first record each process emits, not at dictConfig
+    time: a thread started before a fork (Celery prefork children, a preloading
+    server) does not exist in the child, so its records would never be written.
+    """
+
+    def __init__(self, stream):
+        super().__init__(queue.SimpleQueue())
+        self._stream = stream
+        self._pid = None
+        self._listener = None
+
+    def emit(self, record):
+        # Runs under the handler lock, which logging re-creates in a forked child
+        if self._pid != os.getpid():
+            self._start_listener()
+        super().emit(record)
+
+    def _start_listener(self):
+        # Records copied over by the fork are the parent's to write
+        self.queue = queue.SimpleQueue()
+        self._listener = QueueListener(self.queue, self._stream, respect_handler_level=True)
+        self._listener.start()
+        atexit.register(self._listener.stop)
+        self._pid = os.getpid()
+
+    def prepare(self, record):
+        # Same process, so the record can cross as-is; the listener formats it
+        return record
+
+
+def queued_stream_handler(fmt=None):
+    """
+    Logging handler factory for settings.LOGGING ("()": ...).
+    Works on Python 3.11, where dictConfig cannot wire a QueueListener itself.
+    """
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter(fmt))
+    return _DeferredQueueHandler(stream)
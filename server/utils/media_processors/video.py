@@ -4,7 +4,7 @@ import tempfile
 import logging
 import magic
 import ffmpeg
-from utils.aws import s3, AWS_BUCKET
+from utils.aws import s3
 from .ffmpeg_progress import FFmpegProgressTracker
 
 logger = logging.getLogger(__name__)
@@ -8,12 +8,44 @@ class BaseCursorPagination(CursorPagination):
     success_message: str = None
 
     def get_paginated_response(self, data):
+        return self.build_response(data, self.get_next_link(), self.get_previous_link())
+
+    def build_response(self, data, next_link, previous_link=None):
+        # Same envelope for pages served from a cache (no paginate_queryset() run)
         return success_response(
             message=self.success_message,
             data={
                 self.data_key: data,
-                "next": self.get_next_link(),
-                "previous": self.get_previous_link()
+                "next": next_link,
+                "previous": previous_link
             },
             status=200
         )
+
+
+class UnionAllQuerySet:
+    """
+    Duck-typed stand-in for a QuerySet that CursorPagination can drive.
+    order_by/filter are applied to every branch, and slicing pushes the LIMIT
+    into each branch before the UNION ALL, so each side is an O(page) index scan
+    instead of filtering an OR across the whole table and sorting afterwards.
+    """
+
+    def __init__(self, *branches, ordering=()):
+        self.branches = branches
+        self.ordering = ordering
+
+    def order_by(self, *fields):
+        return UnionAllQuerySet(*(b.order_by(*fields) for b in self.branches), ordering=fields)
+
+    def filter(self, *args, **kwargs):
+        return UnionAllQuerySet(*(b.filter(*args, **kwargs) for b in self.branches), ordering=self.ordering)
+
+    def __getitem__(self, k):
+        if not isinstance(k, slice):
+            raise TypeError("UnionAllQuerySet only supports slicing")
+
+        # Each branch is already ordered, so the first `stop` rows of each are enough
+        branches = [b[:k.stop] for b in self.branches]
+        combined = branches[0].union(*branches[1:], all=True)
+        return combined.order_by(*self.ordering)[k]
@@ -1,5 +1,9 @@
 import os
+import socket
+import asyncio
+import weakref
 from urllib.parse import urlparse
+import orjson
 import redis.asyncio as async_redis  # Rename for clarity
 import redis as sync_redis           # <--- ADD THIS (Standard synchronous lib)
 
@@ -11,25 +15,53 @@ redis_host = parsed.hostname
 redis_port = parsed.port
 redis_db = int(parsed.path.lstrip("/")) if parsed.path else 0
 
+# Shared pool settings. redis-py picks the hiredis parser up automatically when installed.
+POOL_KWARGS = {
+    "host": redis_host,
+    "port": redis_port,
+    "db": redis_db,
+    "decode_responses": True,
+    "max_connections": 128,
+    "socket_keepalive": True,
+    "socket_keepalive_options": {socket.TCP_KEEPIDLE: 60} if hasattr(socket, "TCP_KEEPIDLE") else {},
+    "health_check_interval": 30,
+}
+
 # --- 1. ASYNC CLIENT (For Views/Consumers) ---
-redis_client = async_redis.Redis(
-    host=redis_host,
-    port=redis_port,
-    db=redis_db,
-    decode_responses=True
-)
-
-# --- 2. SYNC CLIENT (For Celery Tasks) ---
-sync_redis_client = sync_redis.Redis(
-    host=redis_host,
-    port=redis_port,
-    db=redis_db,
-    decode_responses=True
-)
+# asyncio connections are bound to the loop that opened them, and every
+# async_to_sync() call from a sync view may run on a different loop.
+# Keep one pool per event loop so nothing is shared across loops.
+_loop_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_redis_client():
+    loop = asyncio.get_running_loop()
+    client = _loop_clients.get(loop)
+    if client is None:
+        pool = async_redis.ConnectionPool(**POOL_KWARGS)
+        client = _loop_clients[loop] = async_redis.Redis(connection_pool=pool)
+    return client
+
+
+class _LoopLocalRedis:
+    """Proxy so callers can keep using `redis_client.<cmd>` from any loop."""
+
+    def __getattr__(self, name):
+        return getattr(get_async_redis_client(), name)
+
+
+redis_client = _LoopLocalRedis()
+
+# --- 2. SYNC CLIENT (For Views & Celery Tasks) ---
+sync_redis_pool = sync_redis.ConnectionPool(**POOL_KWARGS)
+sync_redis_client = sync_redis.Redis(connection_pool=sync_redis_pool)
 
 class RedisKeys:
     ONLINE_USERS = "online_users"
 
+    # Pub/Sub channel: payload is the user_id whose profile changed
+    USER_INVALIDATE = "user:invalidate"
+
     @staticmethod
     def active_connections(user_id):
         return f"user:{user_id}:connections"
@@ -42,6 +74,14 @@ class RedisKeys:
     def presence_audience(target_user_id):
         return f"user:{target_user_id}:presence_audience"
 
+    @staticmethod
+    def chat_list_version(user_id):
+        return f"user:{user_id}:chat_list:ver"
+
+    @staticmethod
+    def chat_list_page(user_id):
+        return f"user:{user_id}:chat_list:page"
+
 # --- 3. UTILITY SERVICE ---
 class ChatRedisService:
     """
@@ -61,35 +101,87 @@ class ChatRedisService:
     @staticmethod
     async def get_online_status_batch(user_ids: list[int]) -> dict[int, bool]:
         if not user_ids: return {}
-        pipeline = redis_client.pipeline()
-        for uid in user_ids:
-            pipeline.sismember(RedisKeys.ONLINE_USERS, uid)
-        results = await pipeline.execute()
+        # One SMISMEMBER (Redis >= 6.2) instead of a SISMEMBER per user
+        results = await redis_client.smismember(RedisKeys.ONLINE_USERS, user_ids)
         return {uid: bool(is_online) for uid, is_online in zip(user_ids, results)}
 
     @staticmethod
-    async def subscribe_and_get_presences(observer_id: int, target_ids: list[int]) -> dict[int, bool]:
-        if not target_ids: return {}
-        pipeline = redis_client.pipeline()
+    def _queue_subscribe_and_presences(pipeline, observer_id, target_ids):
+        # 1. Subscribe
         for target_id in target_ids:
-            # 1. Subscribe
             audience_key = RedisKeys.presence_audience(target_id)
             pipeline.sadd(audience_key, observer_id)
             pipeline.expire(audience_key, 60 * 60 * 24 * 7)
-            # 2. Check Status
-            pipeline.sismember(RedisKeys.ONLINE_USERS, target_id)
+        # 2. Check Status: every target in one SMISMEMBER, queued last
+        pipeline.smismember(RedisKeys.ONLINE_USERS, target_ids)
+
+    @staticmethod
+    def _parse_presences(target_ids, results):
+        return {target_id: bool(is_online) for target_id, is_online in zip(target_ids, results[-1])}
+
+    @staticmethod
+    async def subscribe_and_get_presences(observer_id: int, target_ids: list[int]) -> dict[int, bool]:
+        if not target_ids: return {}
+        pipeline = redis_client.pipeline()
+        ChatRedisService._queue_subscribe_and_presences(pipeline, observer_id, target_ids)
         results = await pipeline.execute()
-        
-        status_map = {}
-        # Iterate with step=3 (SADD, EXPIRE, SISMEMBER)
-        for i, target_id in enumerate(target_ids):
-            result_index = (i * 3) + 2 
-            status_map[target_id] = bool(results[result_index])
-        return status_map
+        return ChatRedisService._parse_presences(target_ids, results)
+
+    @staticmethod
+    def subscribe_and_get_presences_sync(observer_id: int, target_ids: list[int]) -> dict[int, bool]:
+        """Same as subscribe_and_get_presences, for sync views (no async_to_sync loop spin-up)."""
+        if not target_ids: return {}
+        # Plain pipeline (no MULTI/EXEC): the commands are independent, we only want one RTT
+        pipeline = sync_redis_client.pipeline(transaction=False)
+        ChatRedisService._queue_subscribe_and_presences(pipeline, observer_id, target_ids)
+        results = pipeline.execute()
+        return ChatRedisService._parse_presences(target_ids, results)
 
     @staticmethod
     async def is_user_viewing(viewer_id: int, target_id: int) -> bool:
         """Checks if ANY of the user's active sockets are viewing the target."""
         key = RedisKeys.viewing(viewer_id, target_id)
         count = await redis_client.scard(key)
-        return count > 0
\ No newline at end of file
+        return count > 0
+
+
+class ChatListCache:
+    """
+    First page of a user's chat list, cached as one blob stamped with a version.
+    Every Conversation write bumps the version of both participants (after commit),
+    so a blob is only served while its stamp still matches: no delete/refill race,
+    a reader that loses it just stores a blob nobody will ever match.
+    """
+    PAGE_TTL = 60 * 5
+    VERSION_TTL = 60 * 60 * 24
+
+    @staticmethod
+    def read(user_id):
+        """Returns (version, payload or None) in one round trip."""
+        pipeline = sync_redis_client.pipeline(transaction=False)
+        pipeline.get(RedisKeys.chat_list_version(user_id))
+        pipeline.get(RedisKeys.chat_list_page(user_id))
+        version, blob = pipeline.execute()
+        version = int(version or 0)
+        if blob is None:
+            return version, None
+        cached = orjson.loads(blob)
+        if cached["v"] != version:
+            return version, None
+        return version, cached["page"]
+
+    @staticmethod
+    def store(user_id, version, payload):
+        # `version` must be the one read BEFORE the SQL fetch
+        blob = orjson.dumps({"v": version, "page": payload})
+        sync_redis_client.set(RedisKeys.chat_list_page(user_id), blob, ex=ChatListCache.PAGE_TTL)
+
+    @staticmethod
+    def invalidate(user_ids):
+        if not user_ids: return
+        pipeline = sync_redis_client.pipeline(transaction=False)
+        for uid in set(user_ids):
+            key = RedisKeys.chat_list_version(uid)
+            pipeline.incr(key)
+            pipeline.expire(key, ChatListCache.VERSION_TTL)
+        pipeline.execute()
@@ -1,9 +1,22 @@
+import time
+import logging
+import secrets
+import threading
+from functools import lru_cache
+from urllib.parse import quote
 import boto3
-import uuid
+from concurrent.futures import ThreadPoolExecutor
+from botocore import auth as botocore_auth
+from botocore.awsrequest import AWSRequest
 from botocore.config import Config
-from botocore.exceptions import ClientError
+from botocore.credentials import RefreshableCredentials
+from botocore.exceptions import ClientError, NoCredentialsError
 from django.conf import settings
 
+from utils.fast_presign import signing_pads, hmac_hexdigest, amz_timestamp, PresignBatchContext, PutObjectPresignContext
+
+logger = logging.getLogger(__name__)
+
 # --- 1. CONFIGURATION CONSTANTS ---
 
 # We read from Django settings to ensure consistency with .env and Docker
@@ -23,24 +36,57 @@ MAX_BATCH_COUNT = 500               # Security Cap
 # --- 2. S3 CLIENT INITIALIZATION ---
 
 # Custom Config for Signature Version 4 (Required for Presigned URLs)
+# One process-wide client: a warm pool + keepalive means create/complete multipart
+# calls reuse an open TLS connection instead of handshaking each time.
 my_config = Config(
     region_name=AWS_REGION,
     signature_version='s3v4',
-    retries={'max_attempts': 3, 'mode': 'standard'}
+    retries={'max_attempts': 3, 'mode': 'adaptive'},
+    max_pool_connections=100,
+    tcp_keepalive=True,
+    # Moto is reached by hostname (s3mock:5000), so only real S3 goes virtual-hosted
+    s3={'addressing_style': 'path' if USE_MOCK else 'virtual'},
 )
 
 # Initialize Client
 # Logic: If USE_S3_MOCK is True, we pass the 'endpoint_url'. 
 # If False (Production), we pass None, letting boto3 use real AWS URLs.
-s3 = boto3.client(
-    's3',
+# An explicit session: the fast presigner reads the client's credentials through
+# session.get_credentials() (the same refreshable object the client signs with).
+_session = boto3.session.Session(
     aws_access_key_id=AWS_ACCESS_KEY_ID,
     aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
     region_name=AWS_REGION,
+)
+s3 = _session.client(
+    's3',
     config=my_config,
     endpoint_url=MOCK_ENDPOINT if USE_MOCK else None
 )
 
+# --- 2b. PRESIGN SIGNING-KEY CACHE ---
+# botocore re-derives the SigV4 signing key (4 chained HMACs) for every URL it
+# presigns, although the key only changes once per UTC day. This signer caches it
+# per (date, region). It is not registered with botocore: only _query_signer()
+# below builds it, so other clients and s3.generate_presigned_url keep the stock
+# signer (the remaining callers sign one URL per request).
+
+
+class CachedKeyS3SigV4QueryAuth(botocore_auth.S3SigV4QueryAuth):
+    """
+    Drop-in S3 query signer: identical URLs, one HMAC per URL instead of five.
+    Overrides the same signature() step as SigV4Auth and reads the date the same way.
+    """
+
+    def signature(self, string_to_sign, request):
+        pads = signing_pads(
+            self.credentials.secret_key,
+            request.context["timestamp"][0:8],
+            self._region_name,
+            self._service_name,
+        )
+        return hmac_hexdigest(pads, string_to_sign.encode("utf-8"))
+
 # --- 3. MOTO / LOCAL MOCK SETUP (The "Magic" Part) ---
 
 if USE_MOCK:
@@ -78,17 +124,171 @@ else:
 
 # --- 4. HELPER FUNCTIONS ---
 
+# Basic sanitization to prevent weird path issues: one translate() pass
+_KEY_FILENAME_TABLE = str.maketrans({" ": "_", "/": None})
+
+
 def new_object_key(user_id, filename):
     """
     Generates a secure, unique, and organized file path for S3.
-    Structure: uploads/user_{id}/{uuid}/{filename}
+    Structure: uploads/user_{id}/{token}/{filename}
+    The token is 128 random bits as 22 URL-safe chars (a uuid4 carries 122),
+    minus uuid4's int round trip and hyphenated hex formatting.
     """
-    unique_id = str(uuid.uuid4())
-    # Basic sanitization to prevent weird path issues
-    clean_filename = filename.replace(" ", "_").replace("/", "")
-    
+    unique_id = secrets.token_urlsafe(16)
+    clean_filename = filename.translate(_KEY_FILENAME_TABLE)
+
     return f"uploads/user_{user_id}/{unique_id}/{clean_filename}"
 
+# Shared pool for S3 calls that wait on the network (boto3 clients are thread-safe).
+# 16 workers is where parallel small S3 operations stop getting faster.
+PRESIGN_WORKERS = 16
+presign_executor = ThreadPoolExecutor(max_workers=PRESIGN_WORKERS, thread_name_prefix="s3-presign")
+
+
+# The hand-rolled signer covers real AWS with DNS-safe bucket names, whatever the
+# credential source: keys are read from the client, so role/STS credentials work too.
+# Moto endpoints and dotted buckets go through _sign_url() below.
+FAST_PRESIGN = bool(not USE_MOCK and AWS_BUCKET and "." not in AWS_BUCKET)
+
+
+def _frozen_credentials():
+    # Same credential object the client refreshes; frozen so key, secret and
+    # token are read consistently while it rotates
+    credentials = _session.get_credentials()
+    if credentials is None:
+        raise NoCredentialsError()
+    _ensure_credential_refresher(credentials)
+    return credentials.get_frozen_credentials()
+
+
+# Role/STS credentials (IRSA, instance profile) refresh inside get_frozen_credentials():
+# whichever caller first enters botocore's advisory window makes the STS/IMDS call
+# itself. A daemon thread polls the same public call every minute, so once the
+# window opens the refresh almost always runs there, long before botocore's
+# blocking mandatory window. Static keys have no expiry and never start the thread.
+CREDENTIAL_REFRESH_INTERVAL = 60
+_refresher_started = False
+_refresher_lock = threading.Lock()
+
+
+def _refresh_if_due(credentials):
+    # Public API only: refreshes when botocore's advisory window has opened, else a no-op
+    credentials.get_frozen_credentials()
+
+
+def _refresh_credentials_forever(credentials):
+    while True:
+        time.sleep(CREDENTIAL_REFRESH_INTERVAL)
+        try:
+            _refresh_if_due(credentials)
+        except Exception:
+            # botocore still refreshes on the request path if this keeps failing
+            logger.warning("Background AWS credential refresh failed", exc_info=True)
+
+
+def _ensure_credential_refresher(credentials):
+    global _refresher_started
+    if _refresher_started or not isinstance(credentials, RefreshableCredentials):
+        return
+    with _refresher_lock:
+        if _refresher_started:
+            return
+        threading.Thread(
+            target=_refresh_credentials_forever, args=(credentials,), name="aws-credential-refresh", daemon=True
+        ).start()
+        _refresher_started = True
+
+
+@lru_cache(maxsize=4)
+def _put_context(timestamp, expires, credentials):
+    # X-Amz-Date has 1s resolution, so every direct URL signed within the same
+    # second (an album, a burst of senders) shares one prebuilt context.
+    return PutObjectPresignContext(
+        AWS_BUCKET, expires, credentials.access_key, credentials.secret_key, AWS_REGION, timestamp,
+        credentials.token,
+    )
+
+
+# Everywhere else (Moto, dotted buckets) we still skip generate_presigned_url's
+# per-call param build, validation and event chain:
+# the URL is assembled here and signed by the same query signer it ends in.
+
+@lru_cache(maxsize=8)
+def _endpoint_base(bucket):
+    # Scheme, host and (path-style) bucket exactly as botocore resolves them; once per bucket
+    url = s3.generate_presigned_url(
+        ClientMethod="upload_part",
+        Params={"Bucket": bucket, "Key": "k", "UploadId": "u", "PartNumber": 1},
+        ExpiresIn=60,
+    )
+    return url.split("/k?", 1)[0]
+
+
+def _object_url(object_key):
+    return f"{_endpoint_base(AWS_BUCKET)}/{quote(object_key, safe='/~')}"
+
+
+def _query_signer(expires):
+    # Credentials frozen and signer built once per call site, not per URL: freezing
+    # refreshable credentials takes the refresh lock and checks expiry each time
+    return CachedKeyS3SigV4QueryAuth(_frozen_credentials(), "s3", s3.meta.region_name, expires=expires)
+
+
+def _sign_url(url, signer, headers=None):
+    request = AWSRequest(method="PUT", url=url, headers=headers)
+    signer.add_auth(request)
+    # Moto is reached as s3mock:5000 inside Docker, localhost:5000 from the host
+    return request.url.replace("s3mock:5000", "localhost:5000") if USE_MOCK else request.url
+
+
+def presign_put_object(object_key, content_type, expires=DEFAULT_EXPIRES_DIRECT):
+    """
+    Presigned PUT URL for a direct upload; Content-Type is part of the signature.
+    """
+    if FAST_PRESIGN:
+        return _put_context(amz_timestamp(), expires, _frozen_credentials()).url_for(object_key, content_type)
+    return _sign_url(_object_url(object_key), _query_signer(expires), headers={"Content-Type": content_type})
+
+
+def presign_upload_parts(object_key, upload_id, part_numbers, expires=DEFAULT_EXPIRES_PART):
+    """
+    Presigns `upload_part` URLs for a window of part numbers.
+    Returns [{"part_number": pn, "url": url}, ...] in input order.
+    """
+    if FAST_PRESIGN:
+        # One context per window; each URL is then a single SHA256 + HMAC
+        credentials = _frozen_credentials()
+        ctx = PresignBatchContext(
+            AWS_BUCKET, object_key, upload_id, expires,
+            credentials.access_key, credentials.secret_key, AWS_REGION,
+            security_token=credentials.token,
+        )
+        return [{"part_number": pn, "url": ctx.url_for(pn)} for pn in part_numbers]
+
+    # Serial on purpose: signing is pure Python under the GIL, so fanning a window
+    # out over presign_executor measured no faster and kept its workers from the
+    # create_multipart_upload round trips they exist for.
+    prefix = f"{_object_url(object_key)}?uploadId={quote(upload_id, safe='-_.~')}&partNumber="
+    signer = _query_signer(expires)
+    return [{"part_number": pn, "url": _sign_url(f"{prefix}{pn}", signer)} for pn in part_numbers]
+
+# --- 5. WARM-UP ---
+# botocore loads operation models, endpoint rules and the presign handler chain
+# lazily on first use. Pay that once at import (offline: presigning does no I/O)
+# instead of on the first upload request each worker serves.
+for _op in ("CreateMultipartUpload", "CompleteMultipartUpload", "UploadPart", "PutObject"):
+    s3.meta.service_model.operation_model(_op)
+try:
+    s3.generate_presigned_url(
+        ClientMethod="upload_part",
+        Params={"Bucket": "warmup", "Key": "warmup", "UploadId": "warmup", "PartNumber": 1},
+        ExpiresIn=60,
+    )
+except NoCredentialsError:
+    # e.g. manage.py commands in a build step - nothing to warm
+    pass
+
 # Monkey-patch the custom generator onto the client object for convenience
 # (Optional, but makes imports cleaner in other files)
 s3.generate_presigned_url_custom = generate_presigned_url
\ No newline at end of file